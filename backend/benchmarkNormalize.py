@@ -0,0 +1,85 @@
+"""
+Benchmark of the narration normalization: the previous pydub path against the NumPy one.
+
+    python benchmarkNormalize.py [--sections 8] [--seconds 15] [--rounds 5]
+
+The gain stage is measured on its own (no ffmpeg needed). The full pipelines are measured when
+ffmpeg is installed:
+  pydub: MP3 bytes -> pydub decode (ffmpeg) -> apply_gain -> pydub export (ffmpeg, temp files)
+  numpy: PCM from TTS -> normalize_pcm_batch (all sections at once) -> one ffmpeg encode per section
+"""
+import argparse
+import io
+import shutil
+import time
+
+from pydub import AudioSegment
+from pydub.generators import Sine
+
+from core.services.audioModifyServices import encode_pcm_to_mp3, normalize_pcm_batch
+
+FRAME_RATE = 22050
+
+
+def make_clips(sections, seconds):
+    # one tone per section at a different level, like narrations of different loudness
+    return [
+        Sine(220 + 40 * i, sample_rate=FRAME_RATE, bit_depth=16).to_audio_segment(duration=seconds * 1000).apply_gain(-4 - i)
+        for i in range(sections)
+    ]
+
+
+def best_of(rounds, fn):
+    times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def pydub_gain(segments):
+    return [segment.apply_gain(-3.0 - segment.max_dBFS) for segment in segments]
+
+
+def pydub_pipeline(mp3_clips):
+    results = []
+    for clip in mp3_clips:
+        audio = AudioSegment.from_file(io.BytesIO(clip), format="mp3")
+        output = io.BytesIO()
+        audio.apply_gain(-3.0 - audio.max_dBFS).export(output, format="mp3")
+        results.append(output.getvalue())
+    return results
+
+
+def numpy_pipeline(pcm_clips):
+    return [encode_pcm_to_mp3(clip, FRAME_RATE) for clip in normalize_pcm_batch(pcm_clips)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sections", type=int, default=8)
+    parser.add_argument("--seconds", type=int, default=15)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    segments = make_clips(args.sections, args.seconds)
+    pcm_clips = [segment.raw_data for segment in segments]
+    print(f"{args.sections} sections of {args.seconds}s at {FRAME_RATE} Hz, best of {args.rounds} rounds")
+
+    pydub_time = best_of(args.rounds, lambda: pydub_gain(segments))
+    numpy_time = best_of(args.rounds, lambda: normalize_pcm_batch(pcm_clips))
+    print(f"gain stage     pydub {pydub_time * 1000:8.1f} ms   numpy batch {numpy_time * 1000:8.1f} ms")
+
+    if shutil.which(AudioSegment.converter) is None:
+        print(f"'{AudioSegment.converter}' not found, skipping the full decode/encode pipelines")
+        return
+
+    mp3_clips = [encode_pcm_to_mp3(clip, FRAME_RATE) for clip in pcm_clips]
+    pydub_time = best_of(args.rounds, lambda: pydub_pipeline(mp3_clips))
+    numpy_time = best_of(args.rounds, lambda: numpy_pipeline(pcm_clips))
+    print(f"full pipeline  pydub {pydub_time * 1000:8.1f} ms   numpy batch {numpy_time * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1 +1,52 @@
+import os
+
 AUDIO_BUCKET_NAME= "GCS_BUCKET_NAME_FOR_AUDIO_FILES"
+
+# Game feed cache. Backend is "disk" (compressed files under FEED_CACHE_DIR) or "redis".
+FEED_CACHE_BACKEND = os.environ.get("FEED_CACHE_BACKEND", "disk")
+FEED_CACHE_DIR = os.environ.get("FEED_CACHE_DIR", "feedCache")
+
+# SQLite file holding the local index of the MLB schedule
+SCHEDULE_INDEX_PATH = os.environ.get("SCHEDULE_INDEX_PATH", "scheduleIndex.sqlite3")
+
+# Highlight lists keep growing (recap, condensed game) for hours after the final out. A Final game's list
+# is cached for HIGHLIGHTS_RECENT_FINAL_TTL seconds, and forever once the game started more than
+# HIGHLIGHTS_SETTLED_AGE seconds ago.
+HIGHLIGHTS_RECENT_FINAL_TTL = int(os.environ.get("HIGHLIGHTS_RECENT_FINAL_TTL", 3600))
+HIGHLIGHTS_SETTLED_AGE = int(os.environ.get("HIGHLIGHTS_SETTLED_AGE", 24 * 3600))
+
+# Game rewind cache: seconds a generated rewind is kept, and the largest compressed value stored
+REWIND_CACHE_TTL = int(os.environ.get("REWIND_CACHE_TTL", 7 * 24 * 3600))
+REWIND_CACHE_MAX_BYTES = int(os.environ.get("REWIND_CACHE_MAX_BYTES", 512 * 1024))
+
+# Redis used by the rewind and feed caches
+REDIS_HOST = os.environ.get("REDIS_HOST", "localhost")
+REDIS_PORT = int(os.environ.get("REDIS_PORT", 6379))
+REDIS_DB = int(os.environ.get("REDIS_DB", 0))
+REDIS_MAX_CONNECTIONS = int(os.environ.get("REDIS_MAX_CONNECTIONS", 50))
+
+# TTS audio cache: seconds a synthesized narration (GCS url and duration) is reused
+TTS_CACHE_TTL = int(os.environ.get("TTS_CACHE_TTL", 30 * 24 * 3600))
+
+# Google Cloud clients. CLOUD_BACKEND is "gcp" (Google Cloud, or the local emulators when
+# STORAGE_EMULATOR_HOST / FIRESTORE_EMULATOR_HOST are set) or "fake" (in memory, no credentials needed).
+CLOUD_BACKEND = os.environ.get("CLOUD_BACKEND", "gcp")
+GCP_PROJECT_ID = os.environ.get("GCP_PROJECT_ID", "rewind-448923")
+VERTEX_LOCATION = os.environ.get("VERTEX_LOCATION", "us-central1")
+
+# Gemini highlight video timestamps: seconds a {start, end} answer is reused, and the width in seconds of
+# the narration duration buckets of its cache key
+VIDEO_TIMESTAMP_CACHE_TTL = int(os.environ.get("VIDEO_TIMESTAMP_CACHE_TTL", 30 * 24 * 3600))
+VIDEO_TIMESTAMP_DURATION_BUCKET = float(os.environ.get("VIDEO_TIMESTAMP_DURATION_BUCKET", 2))
+# Seconds a video whose scene indexing failed goes straight to the per narration model call
+SCENE_INDEX_FAILURE_TTL = int(os.environ.get("SCENE_INDEX_FAILURE_TTL", 15 * 60))
+
+# Background pre-ingest of the highlight videos of games that went Final. Off unless enabled, since
+# every server process running it mirrors every video of every game.
+HIGHLIGHT_WARMER_ENABLED = os.environ.get("HIGHLIGHT_WARMER_ENABLED", "0") == "1"
+HIGHLIGHT_WARMER_WORKERS = int(os.environ.get("HIGHLIGHT_WARMER_WORKERS", 4))
+HIGHLIGHT_WARMER_INTERVAL = int(os.environ.get("HIGHLIGHT_WARMER_INTERVAL", 300))
+HIGHLIGHT_WARMER_LOOKBACK_DAYS = int(os.environ.get("HIGHLIGHT_WARMER_LOOKBACK_DAYS", 2))
+# also build the scene index of every warmed video (one Gemini call per video)
+HIGHLIGHT_WARMER_INDEX_SCENES = os.environ.get("HIGHLIGHT_WARMER_INDEX_SCENES", "0") == "1"
+HIGHLIGHT_WARMER_PROGRESS_PATH = os.environ.get("HIGHLIGHT_WARMER_PROGRESS_PATH", "highlightWarmer.sqlite3")
@@ -1,6 +1,7 @@
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Query, HTTPException
+from fastapi.responses import StreamingResponse
 from typing import List
-from core.services.mainServices import get_game_commentary
+from core.services.mainServices import get_game_commentary, stream_game_commentary
 
 router = APIRouter()
 import json
@@ -29,6 +30,50 @@ def get_game_rewind(
     return get_game_commentary(game_id, focus_players, focus_areas, focus_teams, music_url, language)
 
 
+def format_rewind_message(message, stream_format):
+    if stream_format == "ndjson":
+        return json.dumps(message) + "\n"
+    return f"event: {message['type']}\ndata: {json.dumps(message)}\n\n"
+
+
+def rewind_stream(messages, stream_format):
+    try:
+        for message in messages:
+            yield format_rewind_message(message, stream_format)
+    except Exception as e:
+        # the status line is already sent, report the failure as the last message
+        print(f"Error streaming game rewind: {e}")
+        yield format_rewind_message({"type": "error", "message": str(e)}, stream_format)
+
+
+@router.get("/game-rewind/stream")
+def stream_game_rewind(
+    game_id: str,
+    music_url: str,
+    language: str,
+    focus_players: List[str] = Query(default=[]),
+    focus_areas: List[str] = Query(default=[]),
+    focus_teams: List[str] = Query(default=[]),
+    format: str = "sse",
+):
+    """
+    Stream a game rewind as server-sent events (format=sse) or NDJSON lines (format=ndjson).
+    The header comes first, then every section in order as soon as it is ready; the "done"
+    message carries the total_duration.
+    """
+    if format not in ("sse", "ndjson"):
+        raise HTTPException(status_code=400, detail="format must be 'sse' or 'ndjson'")
+
+    messages = stream_game_commentary(game_id, focus_players, focus_areas, focus_teams, music_url, language)
+    media_type = "application/x-ndjson" if format == "ndjson" else "text/event-stream"
+    return StreamingResponse(
+        rewind_stream(messages, format),
+        media_type=media_type,
+        # keep proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/getFocusAreas")
 def get_focus_areas():
     """
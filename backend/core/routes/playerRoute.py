@@ -0,0 +1,25 @@
+from fastapi import APIRouter, HTTPException
+from core.services.playerServices import get_player_cards
+
+router = APIRouter()
+
+# largest number of ids accepted by one /getPlayerCards call
+MAX_PLAYER_CARDS_PER_REQUEST = 200
+
+
+@router.get("/getPlayerCards")
+def get_player_cards_route(ids: str):
+    """
+    Get the player cards of several players at once. ids is a comma separated list of player IDs.
+    """
+    try:
+        player_ids = [int(player_id) for player_id in ids.split(",") if player_id.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be a comma separated list of player IDs")
+    if len(player_ids) > MAX_PLAYER_CARDS_PER_REQUEST:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_PLAYER_CARDS_PER_REQUEST} ids per request")
+
+    try:
+        return {"players": get_player_cards(player_ids)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,7 +1,7 @@
 
 from fastapi import APIRouter, HTTPException, Query
 from typing import List
-from core.services.teamServices import get_all_teams, get_all_teams_detailed, getTeamDetails, get_all_teams_display_data, get_game_team_roster_with_team_id
+from core.services.teamServices import get_all_teams, get_all_teams_detailed, getTeamDetails, get_all_teams_display_data, get_game_team_roster
 from pydantic import BaseModel
 import logging
 
@@ -63,13 +63,10 @@ def get_game_team_details_route(game_id: str, team_id: str):
 
     try:
         teamInfo = getTeamDetails(team_id)
-        roster_raw = get_game_team_roster_with_team_id(team_id=int(team_id), game_id=str(game_id))
         roster = []
-       
-        for key, value in roster_raw.items():
-            player ={}
-            player["id"] = value["person"]["id"]
-            player["name"] = value["person"]["fullName"]
+
+        for value in get_game_team_roster(team_id=int(team_id), game_id=str(game_id)):
+            player = dict(value)
             player["snapshot"] = f"https://securea.mlb.com/mlb/images/players/head_shot/{player['id']}.jpg"
             roster.append(player)
         teamInfo["roster"] = roster
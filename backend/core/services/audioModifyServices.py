@@ -1,15 +1,113 @@
 from pydub import AudioSegment
+import io
 import os
+import subprocess
+
+import numpy as np
 
 def normalize_audio(input_path, output_path, target_dBFS=-3.0):
     """Normalize an audio file to the target dBFS (decibels relative to full scale)."""
-    audio = AudioSegment.from_file(input_path)
-    
-    # Calculate the difference between target dBFS and current loudness
-    change_in_dBFS = target_dBFS - audio.max_dBFS
-    
-    # Apply the gain change
-    normalized_audio = audio.apply_gain(change_in_dBFS)
-    
+    with open(input_path, "rb") as f:
+        normalized = normalize_audio_bytes(f.read(), target_dBFS)
+
     # Export the normalized file
-    normalized_audio.export(output_path, format="mp3")
\ No newline at end of file
+    with open(output_path, "wb") as f:
+        f.write(normalized)
+
+
+# raw PCM formats of ffmpeg and NumPy sample types for each sample width (in bytes) of signed PCM
+_PCM_FORMATS = {2: "s16le", 4: "s32le"}
+_PCM_DTYPES = {2: np.dtype("<i2"), 4: np.dtype("<i4")}
+
+
+def _check_sample_width(sample_width):
+    if sample_width not in _PCM_DTYPES:
+        raise ValueError(f"Unsupported sample width {sample_width}, expected one of {sorted(_PCM_DTYPES)}")
+
+
+def _gain_for(level, target_dBFS):
+    # silence has no level to match, it is left as is instead of getting an infinite gain
+    if level <= 0:
+        return 1.0
+    return 10 ** ((target_dBFS - 20 * np.log10(level)) / 20)
+
+
+def _clip_levels(samples, starts, mode):
+    """Peak or RMS level (in sample units) of every clip of a concatenated sample buffer, in one pass."""
+    if mode == "peak":
+        highest = np.maximum.reduceat(samples, starts).astype(np.int64)
+        lowest = np.minimum.reduceat(samples, starts).astype(np.int64)
+        return np.maximum(highest, -lowest)
+    if mode == "rms":
+        lengths = np.diff(np.append(starts, len(samples)))
+        return np.sqrt(np.add.reduceat(np.square(samples, dtype=np.float64), starts) / lengths)
+    raise ValueError(f"Unknown normalization mode {mode}, expected 'peak' or 'rms'")
+
+
+def normalize_pcm_batch(clips, sample_width=2, target_dBFS=-3.0, mode="peak"):
+    """
+    Normalize several signed little-endian PCM clips at once, each with its own gain.
+    mode "peak" brings the loudest sample to target_dBFS (same as normalize_audio). mode "rms" brings
+    the average loudness to target_dBFS instead (unweighted, so only an approximation of LUFS), and
+    clips the peaks that end up over full scale.
+    All clips are measured and scaled in one NumPy buffer, without spawning ffmpeg.
+    """
+    _check_sample_width(sample_width)
+    dtype = _PCM_DTYPES[sample_width]
+    clips = list(clips)
+    if not clips:
+        return []
+
+    samples = np.frombuffer(b"".join(clips), dtype=dtype)
+    lengths = np.array([len(clip) // sample_width for clip in clips])
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+
+    # empty clips have no level and keep a gain of 1
+    nonempty = lengths > 0
+    levels = np.zeros(len(clips))
+    if nonempty.any():
+        levels[nonempty] = _clip_levels(samples, starts[nonempty], mode) / float(2 ** (8 * sample_width - 1))
+
+    # float32 is exact for 16 bit samples, 32 bit samples need float64
+    normalized = samples.astype(np.float32 if sample_width == 2 else np.float64)
+    for start, length, level in zip(starts, lengths, levels):
+        normalized[start:start + length] *= _gain_for(level, target_dBFS)
+    np.rint(normalized, out=normalized)
+    info = np.iinfo(dtype)
+    np.clip(normalized, info.min, info.max, out=normalized)
+
+    raw = normalized.astype(dtype).tobytes()
+    bounds = np.append(starts, len(samples)) * sample_width
+    return [raw[bounds[i]:bounds[i + 1]] for i in range(len(clips))]
+
+
+def normalize_pcm(raw, sample_width=2, target_dBFS=-3.0, mode="peak"):
+    """Normalize one PCM clip, see normalize_pcm_batch."""
+    return normalize_pcm_batch([raw], sample_width, target_dBFS, mode)[0]
+
+
+def encode_pcm_to_mp3(raw, frame_rate, channels=1, sample_width=2):
+    """Encode PCM bytes to MP3 bytes, piping the samples through ffmpeg without temp files."""
+    _check_sample_width(sample_width)
+    command = [
+        AudioSegment.converter, "-y",
+        "-f", _PCM_FORMATS[sample_width],
+        "-ar", str(frame_rate),
+        "-ac", str(channels),
+        "-i", "pipe:0",
+        "-f", "mp3",
+        "pipe:1",
+    ]
+    process = subprocess.run(command, input=raw, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    if process.returncode != 0:
+        raise RuntimeError(f"Encoding audio failed: {process.stderr.decode('utf-8', 'ignore')[-500:]}")
+    return process.stdout
+
+
+def normalize_audio_bytes(audio_bytes, target_dBFS=-3.0):
+    """Normalize MP3 bytes to the target dBFS in memory and return the normalized MP3 bytes."""
+    audio = AudioSegment.from_file(io.BytesIO(audio_bytes))
+    if audio.sample_width not in _PCM_DTYPES:
+        audio = audio.set_sample_width(2)
+    normalized = normalize_pcm(audio.raw_data, audio.sample_width, target_dBFS)
+    return encode_pcm_to_mp3(normalized, audio.frame_rate, audio.channels, audio.sample_width)
@@ -0,0 +1,278 @@
+import base64
+import hashlib
+import io
+import itertools
+import logging
+import os
+import threading
+from datetime import datetime
+
+from core.config import CLOUD_BACKEND, GCP_PROJECT_ID, VERTEX_LOCATION
+
+logger = logging.getLogger(__name__)
+
+
+class CloudClients:
+    """
+    Process-wide GCS, Firestore and Vertex AI clients, created on first use and then shared by every
+    request. Bucket handles and Vertex models are kept too, so an upload never pays for client setup.
+
+    backend "gcp" talks to Google Cloud. It also uses the local emulators when STORAGE_EMULATOR_HOST or
+    FIRESTORE_EMULATOR_HOST are set. backend "fake" keeps everything in memory, for local runs without
+    credentials.
+    """
+
+    def __init__(self, backend=CLOUD_BACKEND, project=GCP_PROJECT_ID, location=VERTEX_LOCATION):
+        self.backend = backend
+        self.project = project
+        self.location = location
+        self._lock = threading.Lock()
+        self._storage = None
+        self._firestore = None
+        self._vertex_ready = False
+        self._buckets = {}
+        self._models = {}
+
+    def storage(self):
+        if self._storage is None:
+            with self._lock:
+                if self._storage is None:
+                    self._storage = self._create_storage()
+        return self._storage
+
+    def _create_storage(self):
+        if self.backend == "fake":
+            return FakeStorageClient()
+        from google.cloud import storage
+        if os.environ.get("STORAGE_EMULATOR_HOST"):
+            from google.auth.credentials import AnonymousCredentials
+            return storage.Client(project=self.project, credentials=AnonymousCredentials())
+        return storage.Client()
+
+    def bucket(self, name):
+        bucket = self._buckets.get(name)
+        if bucket is None:
+            bucket = self.storage().bucket(name)
+            with self._lock:
+                bucket = self._buckets.setdefault(name, bucket)
+        return bucket
+
+    def firestore(self):
+        if self._firestore is None:
+            with self._lock:
+                if self._firestore is None:
+                    self._firestore = self._create_firestore()
+        return self._firestore
+
+    def _create_firestore(self):
+        if self.backend == "fake":
+            return FakeFirestoreClient()
+        from google.cloud import firestore
+        if os.environ.get("FIRESTORE_EMULATOR_HOST"):
+            return firestore.Client(project=self.project)
+        return firestore.Client()
+
+    def vertex_model(self, name):
+        """
+        A Vertex AI GenerativeModel, with vertexai initialized once for the project.
+        """
+        model = self._models.get(name)
+        if model is not None:
+            return model
+        with self._lock:
+            if not self._vertex_ready:
+                import vertexai
+                vertexai.init(project=self.project, location=self.location)
+                self._vertex_ready = True
+            if name not in self._models:
+                from vertexai.generative_models import GenerativeModel
+                self._models[name] = GenerativeModel(name)
+            return self._models[name]
+
+
+cloud_clients = CloudClients()
+
+
+def get_storage_client():
+    return cloud_clients.storage()
+
+
+def get_bucket(name):
+    return cloud_clients.bucket(name)
+
+
+def get_firestore_client():
+    return cloud_clients.firestore()
+
+
+def get_vertex_model(name):
+    return cloud_clients.vertex_model(name)
+
+
+# In-memory stand-ins for the parts of the GCS and Firestore clients this backend uses
+
+class FakeBlob:
+    def __init__(self, bucket, name):
+        self.bucket = bucket
+        self.name = name
+        self.content_type = None
+        self.acl = self
+
+    @property
+    def public_url(self):
+        return f"https://storage.googleapis.com/{self.bucket.name}/{self.name}"
+
+    def upload_from_string(self, data, content_type=None):
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        self.content_type = content_type
+        self.bucket.objects[self.name] = bytes(data)
+
+    def upload_from_filename(self, filename, content_type=None):
+        with open(filename, "rb") as f:
+            self.upload_from_string(f.read(), content_type)
+
+    def upload_from_file(self, file_obj, content_type=None, **kwargs):
+        self.upload_from_string(file_obj.read(), content_type)
+
+    def open(self, mode="wb", chunk_size=None, content_type=None, **kwargs):
+        if mode != "wb":
+            raise ValueError(f"FakeBlob only supports mode 'wb', not {mode!r}")
+        return FakeBlobWriter(self, content_type)
+
+    def reload(self):
+        pass
+
+    @property
+    def md5_hash(self):
+        if self.name not in self.bucket.objects:
+            return None
+        return base64.b64encode(hashlib.md5(self.bucket.objects[self.name]).digest()).decode("ascii")
+
+    def download_as_bytes(self):
+        return self.bucket.objects[self.name]
+
+    def exists(self):
+        return self.name in self.bucket.objects
+
+    def delete(self):
+        self.bucket.objects.pop(self.name, None)
+
+    def save_predefined(self, predefined):
+        # acl.save_predefined, access control does not exist in memory
+        pass
+
+
+class FakeBlobWriter(io.BytesIO):
+    # blob.open("wb"), the object is stored on a clean close and dropped on an exception
+    def __init__(self, blob, content_type):
+        super().__init__()
+        self._blob = blob
+        self._content_type = content_type
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self._blob.upload_from_string(self.getvalue(), self._content_type)
+        self.close()
+
+
+class FakeBucket:
+    def __init__(self, name):
+        self.name = name
+        self.objects = {}
+
+    def blob(self, name, chunk_size=None):
+        return FakeBlob(self, name)
+
+
+class FakeStorageClient:
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, name):
+        with self._lock:
+            return self._buckets.setdefault(name, FakeBucket(name))
+
+
+class FakeDocumentSnapshot:
+    def __init__(self, reference, data):
+        self.reference = reference
+        self.id = reference.id
+        self.exists = data is not None
+        self._data = data
+
+    def to_dict(self):
+        return dict(self._data) if self._data is not None else None
+
+    def get(self, field):
+        return self._data.get(field)
+
+
+class FakeDocument:
+    def __init__(self, store, path, id):
+        self._store = store
+        self.path = path
+        self.id = id
+
+    def collection(self, name):
+        return FakeCollection(self._store, f"{self.path}/{name}")
+
+    def get(self):
+        return FakeDocumentSnapshot(self, self._store.get(self.path))
+
+    def set(self, data):
+        self._store[self.path] = dict(data)
+
+    def update(self, data):
+        if self.path not in self._store:
+            raise KeyError(f"No document to update: {self.path}")
+        self._store[self.path].update(data)
+
+    def delete(self):
+        self._store.pop(self.path, None)
+
+
+class FakeCollection:
+    _ids = itertools.count()
+
+    def __init__(self, store, path, order=None, limit=None):
+        self._store = store
+        self.path = path
+        self._order = order
+        self._limit = limit
+
+    def document(self, id=None):
+        id = id or f"fake{next(self._ids)}"
+        return FakeDocument(self._store, f"{self.path}/{id}", id)
+
+    def add(self, data):
+        document = self.document()
+        document.set(data)
+        return datetime.utcnow(), document
+
+    def order_by(self, field, direction="ASCENDING"):
+        return FakeCollection(self._store, self.path, (field, direction == "DESCENDING"), self._limit)
+
+    def limit(self, count):
+        return FakeCollection(self._store, self.path, self._order, count)
+
+    def stream(self):
+        prefix = self.path + "/"
+        documents = [
+            FakeDocumentSnapshot(FakeDocument(self._store, path, path[len(prefix):]), data)
+            for path, data in list(self._store.items())
+            if path.startswith(prefix) and "/" not in path[len(prefix):]
+        ]
+        if self._order is not None:
+            field, descending = self._order
+            documents.sort(key=lambda document: document.get(field), reverse=descending)
+        return iter(documents[:self._limit] if self._limit is not None else documents)
+
+
+class FakeFirestoreClient:
+    def __init__(self):
+        self._store = {}
+
+    def collection(self, name):
+        return FakeCollection(self._store, name)
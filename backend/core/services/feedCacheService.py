@@ -0,0 +1,151 @@
+import json
+import logging
+import os
+import tempfile
+import time
+import zlib
+
+from core.config import FEED_CACHE_BACKEND, FEED_CACHE_DIR
+from core.services.redisCacheService import cache_data, get_cached_data
+
+logger = logging.getLogger(__name__)
+
+# Seconds an entry stays fresh for each abstractGameState. None means it never expires:
+# a Final game does not change anymore.
+FEED_CACHE_TTLS = {
+    "Final": None,
+    "Live": 10,
+    "Preview": 300,
+}
+# Used when the state of the game is not known yet.
+DEFAULT_FEED_CACHE_TTL = 60
+
+FEED_ENDPOINT = "feed/live"
+
+
+def get_game_state(data):
+    """
+    Get the abstractGameState (Preview, Live, Final) of a live feed.
+    """
+    if not data:
+        return None
+    return data.get("gameData", {}).get("status", {}).get("abstractGameState")
+
+
+def get_ttl_for_state(state):
+    return FEED_CACHE_TTLS.get(state, DEFAULT_FEED_CACHE_TTL)
+
+
+def _cache_key(game_pk, endpoint):
+    return f"gamefeed:{endpoint}:{game_pk}"
+
+
+def _cache_path(game_pk, endpoint):
+    return os.path.join(FEED_CACHE_DIR, endpoint.replace("/", "_"), f"{game_pk}.json.z")
+
+
+def _encode(data, state, ttl):
+    entry = {
+        "state": state,
+        "expires_at": None if ttl is None else time.time() + ttl,
+        "data": data,
+    }
+    return zlib.compress(json.dumps(entry, separators=(",", ":")).encode("utf-8"))
+
+
+def _decode(raw):
+    entry = json.loads(zlib.decompress(raw).decode("utf-8"))
+    if entry["expires_at"] is not None and entry["expires_at"] < time.time():
+        return None
+    return entry
+
+
+def _read_entry(game_pk, endpoint):
+    try:
+        if FEED_CACHE_BACKEND == "redis":
+            raw = get_cached_data(_cache_key(game_pk, endpoint))
+        else:
+            path = _cache_path(game_pk, endpoint)
+            if not os.path.exists(path):
+                return None
+            with open(path, "rb") as f:
+                raw = f.read()
+        return _decode(raw) if raw else None
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable feed cache entry {endpoint} for game {game_pk}: {e}")
+        return None
+
+
+def _write_entry(game_pk, endpoint, data, state, ttl):
+    raw = _encode(data, state, ttl)
+    try:
+        if FEED_CACHE_BACKEND == "redis":
+            cache_data(_cache_key(game_pk, endpoint), raw, ttl)
+        else:
+            path = _cache_path(game_pk, endpoint)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # write to a temp file of its own next to the target and rename it, so readers never see a
+            # partial file and concurrent writers (threads included) never share one
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path) + ".", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(raw)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+    except Exception as e:
+        logger.warning(f"Could not cache {endpoint} for game {game_pk}: {e}")
+
+
+def get_cached_game_state(game_pk):
+    """
+    Get the game state stored with the cached live feed, or None when the feed is not cached.
+    """
+    entry = _read_entry(game_pk, FEED_ENDPOINT)
+    return entry["state"] if entry else None
+
+
+def cached_fetch(game_pk, endpoint, fetcher, state=None):
+    """
+    Return the cached value of endpoint for game_pk, or call fetcher() and cache its result.
+
+    state tells how long the value stays fresh. It is either the game state itself or a callable
+    that gets the fetched value and returns the game state. When it is None, the state stored with
+    the cached live feed of the game is used. Final games are kept forever, Live and Preview games
+    get the short TTLs of FEED_CACHE_TTLS. Empty results (failed fetches) are never cached.
+    """
+    entry = _read_entry(game_pk, endpoint)
+    if entry is not None:
+        return entry["data"]
+
+    data = fetcher()
+    if not data:
+        return data
+
+    if callable(state):
+        state = state(data)
+    elif state is None:
+        state = get_cached_game_state(game_pk)
+    _write_entry(game_pk, endpoint, data, state, get_ttl_for_state(state))
+    return data
+
+
+def cached_fetch_with_ttl(key, endpoint, fetcher, ttl):
+    """
+    Same as cached_fetch for data that is not tied to a game state: the entry for key expires after
+    ttl seconds, or never when ttl is None. ttl can also be a callable, only called when the value is
+    fetched.
+    """
+    entry = _read_entry(key, endpoint)
+    if entry is not None:
+        return entry["data"]
+
+    data = fetcher()
+    if not data:
+        return data
+
+    if callable(ttl):
+        ttl = ttl()
+    _write_entry(key, endpoint, data, None, ttl)
+    return data
@@ -4,24 +4,72 @@ import statsapi
 import requests
 import json
 import random
+import threading
+import asyncio
+import concurrent.futures
 from mutagen.mp3 import MP3
 import logging
+from datetime import datetime, timezone
 from core.services.languageService import getLanguageFromCode
-from core.services.teamServices import get_all_roster_ids, get_all_roster_names, get_team_logo_url,getTeamDetails
+from core.services.teamServices import get_game_rosters, get_team_logo_url,getTeamDetails
 from core.services.playerServices import get_player_card_data
 from core.services.teamServices import textify_team_leaders, get_team_leaders
+from core.services.feedCacheService import cached_fetch, cached_fetch_with_ttl, get_game_state, get_ttl_for_state, FEED_ENDPOINT
+from core.services.liveFeedServices import get_live_feed, track_live_game
+from core.services.httpClientService import stats_api_get
+from core.config import HIGHLIGHTS_RECENT_FINAL_TTL, HIGHLIGHTS_SETTLED_AGE
 # private --- ignore --- -
 # Fetch all plays for a given match using game_pk
-def fetch_game_data(game_pk):
-    url = f"https://statsapi.mlb.com/api/v1.1/game/{game_pk}/feed/live"
+def download_game_data(game_pk):
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-        return response.json()
+        return stats_api_get(f"v1.1/game/{game_pk}/feed/live")
     except requests.exceptions.RequestException as e:
         print(f"Error fetching data: {e}")
         return None
 
+# Same as statsapi.game_highlight_data (video highlights sorted by date), through the pooled client
+def download_game_highlights(game_pk):
+    data = stats_api_get("v1/schedule", {
+        "sportId": 1,
+        "gamePk": game_pk,
+        "hydrate": "game(content(highlights(highlights)))",
+        "fields": "dates,date,games,gamePk,content,highlights,items,headline,type,value,title,description,duration,playbacks,name,url",
+    })
+    if not data.get("dates"):
+        return []
+    items = data["dates"][0]["games"][0].get("content", {}).get("highlights", {}).get("highlights", {}).get("items", [])
+    videos = {item["date"]: item for item in items if isinstance(item, dict) and item.get("type") == "video"}
+    return [videos[date] for date in sorted(videos)]
+
+# Cache endpoint of the highlight lists (renamed from "highlights", whose Final entries never expired)
+HIGHLIGHTS_ENDPOINT = "highlightList"
+
+# Seconds the highlight list of a game stays cached. Unlike the feed, the list of a Final game is only
+# kept forever once the game is old enough for MLB to have published every video.
+def get_highlights_ttl(data):
+    state = get_game_state(data)
+    if state != "Final":
+        return get_ttl_for_state(state)
+    try:
+        start = datetime.fromisoformat(data["gameData"]["datetime"]["dateTime"].replace("Z", "+00:00"))
+    except (KeyError, TypeError, ValueError):
+        return HIGHLIGHTS_RECENT_FINAL_TTL
+    if (datetime.now(timezone.utc) - start).total_seconds() > HIGHLIGHTS_SETTLED_AGE:
+        return None
+    return HIGHLIGHTS_RECENT_FINAL_TTL
+
+# Same as download_game_data, but served from the feed cache (Final games are cached forever).
+# Live games are handed to a shared diffPatch poller and then read from memory.
+def fetch_game_data(game_pk):
+    live_feed = get_live_feed(game_pk)
+    if live_feed is not None:
+        return live_feed
+
+    data = cached_fetch(game_pk, FEED_ENDPOINT, lambda: download_game_data(game_pk), state=get_game_state)
+    if get_game_state(data) == "Live":
+        track_live_game(game_pk, data)
+    return data
+
 # Extract play-by-play commentary data
 def extract_highlights(data):
     all_plays = data["liveData"]["plays"]["allPlays"]
@@ -124,6 +172,132 @@ def format_highlights_for_llm(highlights):
     return "\n\n".join(commentary)
 
 
+def extract_boxscore(data):
+    """
+    Build the boxscore_data style dict (gameId, teamInfo, playerInfo, away, home) from a full live feed.
+    statsapi.boxscore_data requests the same document with a field filter, so the full feed is a superset of it.
+    """
+    if not data or "liveData" not in data or "boxscore" not in data["liveData"]:
+        raise ValueError("Boxscore data not found in game data.")
+
+    return {
+        "gameId": data["gameData"]["game"]["id"],
+        "teamInfo": data["gameData"]["teams"],
+        "playerInfo": data["gameData"]["players"],
+        "away": data["liveData"]["boxscore"]["teams"]["away"],
+        "home": data["liveData"]["boxscore"]["teams"]["home"],
+    }
+
+def format_linescore_text(data):
+    """
+    Format the linescore of a live feed as text. Same output as statsapi.linescore without refetching the game.
+    """
+    header_name = data["gameData"]["status"]["abstractGameState"]
+    away_name = data["gameData"]["teams"]["away"]["teamName"]
+    home_name = data["gameData"]["teams"]["home"]["teamName"]
+    innings = data["liveData"]["linescore"].get("innings", [])
+    header_row = []
+    away = []
+    home = []
+
+    for inning in innings:
+        header_row.append(str(inning.get("num", "")))
+        away.append(str(inning.get("away", {}).get("runs", 0)))
+        home.append(str(inning.get("home", {}).get("runs", 0)))
+
+    for i in range(len(innings) + 1, 10):
+        header_row.append(str(i))
+        away.append(" ")
+        home.append(" ")
+
+    header_row.extend(["R", "H", "E"])
+    for row, side in [[away, "away"], [home, "home"]]:
+        totals = data["liveData"]["linescore"].get("teams", {}).get(side, {})
+        row.extend([str(totals.get("runs", 0)), str(totals.get("hits", 0)), str(totals.get("errors", 0))])
+
+    name_width = len(max([header_name, away_name, home_name], key=len)) + 1
+    lines = []
+    for name, row in [[header_name, header_row], [away_name, away], [home_name, home]]:
+        line = ("{:<%s}" % name_width).format(name)
+        line += ("{:^2}" * (len(row) - 3)).format(*row)
+        line += ("{:^4}" * 3).format(*row[-3:])
+        lines.append(line)
+
+    return "\n".join(lines)
+
+
+class GameSnapshot:
+    """
+    Request-scoped view of a single game.
+
+    The live feed and the highlight list are each downloaded at most once, on first use, and the
+    boxscore, linescore and game info are derived from the live feed. Pass one snapshot through every
+    text builder and UI component builder of a request instead of letting each of them refetch.
+    """
+
+    def __init__(self, game_id):
+        self.game_id = game_id
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        self._loaded = {}
+
+    def _load(self, name, loader):
+        # one lock per entry keeps concurrent builders from fetching the same endpoint twice
+        # while different endpoints still load in parallel
+        with self._lock:
+            if name in self._loaded:
+                return self._loaded[name]
+            load_lock = self._load_locks.setdefault(name, threading.Lock())
+        with load_lock:
+            if name not in self._loaded:
+                self._loaded[name] = loader()
+            return self._loaded[name]
+
+    def _fetch_feed(self):
+        data = fetch_game_data(self.game_id)
+        if not data:
+            raise ValueError("Failed to fetch game data.")
+        return data
+
+    @property
+    def feed(self):
+        return self._load("feed", self._fetch_feed)
+
+    @property
+    def boxscore(self):
+        return self._load("boxscore", lambda: extract_boxscore(self.feed))
+
+    @property
+    def linescore(self):
+        return self._load("linescore", lambda: extract_linescore(self.feed))
+
+    @property
+    def linescore_text(self):
+        return self._load("linescore_text", lambda: format_linescore_text(self.feed))
+
+    @property
+    def highlights(self):
+        return self._load("highlights", lambda: cached_fetch_with_ttl(
+            self.game_id, HIGHLIGHTS_ENDPOINT, lambda: download_game_highlights(self.game_id), lambda: get_highlights_ttl(self.feed)
+        ))
+
+    @property
+    def season(self):
+        return self.feed["gameData"]["datetime"]["officialDate"].split("-")[0]
+
+    @property
+    def game_type(self):
+        return self.feed["gameData"]["game"]["type"]
+
+
+def get_game_snapshot(game_id, snapshot=None):
+    """
+    Return the given snapshot, or a fresh one for game_id when the caller did not pass any.
+    """
+    if snapshot is not None:
+        return snapshot
+    return GameSnapshot(game_id)
+
 # Save formatted commentary to a text file
 def save_to_file(content, filename="match_commentary.txt"):
     with open(filename, "w") as file:
@@ -137,18 +311,18 @@ def save_to_file(content, filename="match_commentary.txt"):
 
 
 
-def get_processed_game_data(game_id):
+def get_processed_game_data(game_id, snapshot=None):
     """
     Get processed game data using the game ID.
     """
-    game_data = statsapi.boxscore_data(game_id)
+    game_data = get_game_snapshot(game_id, snapshot).boxscore
     return game_data
 
-def get_game_teams_ids(game_id):
+def get_game_teams_ids(game_id, snapshot=None):
     """
     Get the team IDs for a specific game using the game ID.
     """
-    game_data = get_processed_game_data(game_id)
+    game_data = get_processed_game_data(game_id, snapshot)
     home_team_id = game_data["home"]['team']["id"]
     away_team_id = game_data["away"]['team']["id"]
     return {
@@ -179,32 +353,29 @@ def textify_game_teams_names_and_ids(data):
 
 
 
-def get_game_players_info_text(game_id):
-    teams = get_game_teams_ids(game_id)
-    home_team_id = teams["home_team_id"]
-    away_team_id = teams["away_team_id"]
-    game_data = fetch_game_data(game_id)
+def get_game_players_info_text(game_id, snapshot=None):
+    snapshot = get_game_snapshot(game_id, snapshot)
+    rosters = get_game_rosters(game_id, snapshot.boxscore)
+    home_team_id = rosters["home"]["team_id"]
+    away_team_id = rosters["away"]["team_id"]
+    game_data = snapshot.feed
     # look up team() from statsapi does not work with ids so we need to get the names of the teams another way
     home_team_name = game_data.get("gameData", {}).get("teams", {}).get("home", {}).get("name", "Home Team")
     away_team_name = game_data.get("gameData", {}).get("teams", {}).get("away", {}).get("name", "Away Team")
 
-    home_team_roster_ids = get_all_roster_ids(home_team_id, game_id)
-    away_team_roster_ids = get_all_roster_ids(away_team_id, game_id)
-    home_team_roster_names = get_all_roster_names(home_team_id, game_id)
-    away_team_roster_names = get_all_roster_names(away_team_id, game_id)
     text = ""
     text += f"Home Team: {home_team_name} with Home Team ID : {home_team_id}\n"
-    for i in range(len(home_team_roster_ids)):
-        text += f" Name: {home_team_roster_names[i]} & ID: {home_team_roster_ids[i]}, "
+    for player in rosters["home"]["players"]:
+        text += f" Name: {player['name']} & ID: {player['id']}, "
     text += "\n"
     text += f"Away Team: {away_team_name} with Away Team ID : {away_team_id}\n"
-    for i in range(len(away_team_roster_ids)):
-        text += f"Name: {away_team_roster_names[i]} & ID: {away_team_roster_ids[i]}, "
+    for player in rosters["away"]["players"]:
+        text += f"Name: {player['name']} & ID: {player['id']}, "
 
     return text
 
-def get_game_info(game_id):
-    data = fetch_game_data(game_id)
+def get_game_info(game_id, snapshot=None):
+    data = get_game_snapshot(game_id, snapshot).feed
     if data:
         home_team = data.get("gameData", {}).get("teams", {}).get("home", {}).get("name", "Home Team")
         away_team = data.get("gameData", {}).get("teams", {}).get("away", {}).get("name", "Away Team")
@@ -222,8 +393,8 @@ def get_game_info(game_id):
     else:
         raise ValueError("Failed to fetch game data.")
 
-def get_inning_by_inning_comms(game_pk):
-    data = fetch_game_data(game_pk)
+def get_inning_by_inning_comms(game_pk, snapshot=None):
+    data = get_game_snapshot(game_pk, snapshot).feed
     if data:
         # Extract and format highlights
         home_team = data.get("gameData", {}).get("teams", {}).get("home", {}).get("name", "Home Team")
@@ -258,19 +429,19 @@ def getBoxScore(game_id):
     boxscore = statsapi.boxscore(game_id)
     return boxscore
 
-def get_game_video_highlights(game_id):
+def get_game_video_highlights(game_id, snapshot=None):
     """
     Get video highlights for a specific game using the game ID.
     """
-    video_highlights = statsapi.game_highlight_data(game_id)
+    video_highlights = get_game_snapshot(game_id, snapshot).highlights
     
     return video_highlights
 
-def get_game_video_at_index(game_id, index):
+def get_game_video_at_index(game_id, index, snapshot=None):
     """
     Get video highlights for a specific game using the game ID.
     """
-    video_highlights = statsapi.game_highlight_data(game_id)
+    video_highlights = get_game_video_highlights(game_id, snapshot)
     if video_highlights:
         return video_highlights[index]
     else:
@@ -278,8 +449,8 @@ def get_game_video_at_index(game_id, index):
     
 
 
-def serializeVideoInformation(game_id):
-    video_highlights = get_game_video_highlights(game_id)
+def serializeVideoInformation(game_id, snapshot=None):
+    video_highlights = get_game_video_highlights(game_id, snapshot)
     videos = []
     index = 0 
     for rawVid in video_highlights:
@@ -311,8 +482,8 @@ def serializeVideoInformation(game_id):
     
     #fields : 
 
-def textifyGameVideoHighlights(game_id):
-    serializedVideoInfo = serializeVideoInformation(game_id)
+def textifyGameVideoHighlights(game_id, snapshot=None):
+    serializedVideoInfo = serializeVideoInformation(game_id, snapshot)
     textified = ""
     for vid in serializedVideoInfo:
         currentVideo = ""
@@ -324,57 +495,99 @@ def textifyGameVideoHighlights(game_id):
         textified += currentVideo + "\n"
     return textified
 
-def get_game_full_Info_qa(game_id):
-    bxData = getBoxScore(game_id)
+# upper bound on upstream calls a single feed assembly keeps in flight
+FEED_FETCH_CONCURRENCY = 6
 
-    #bx data is a string that  contains special characer that need to be applied, like \n should be replaced with new line
-    bxData = bxData.replace("\n", "\n ")
-    bxData = str(bxData)
-    ibiData = get_inning_by_inning_comms(game_id)
-    videoData = textifyGameVideoHighlights(game_id)
-    
-    lineScoreText = get_linescore_text(game_id)
-    playerLineup = get_game_players_info_text(game_id)
+def run_coroutine_sync(coro):
+    """
+    Run a coroutine to completion from sync code, also when the calling thread already runs an event loop.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+async def _run_bounded(semaphore, func, *args, **kwargs):
+    async with semaphore:
+        return await asyncio.to_thread(func, *args, **kwargs)
+
+async def get_game_full_Info_qa_async(game_id, snapshot=None):
+    """
+    Build the Q&A game context, downloading the live feed and the highlights concurrently.
+    """
+    snapshot = get_game_snapshot(game_id, snapshot)
+    semaphore = asyncio.Semaphore(FEED_FETCH_CONCURRENCY)
+
+    videoTask = asyncio.create_task(_run_bounded(semaphore, textifyGameVideoHighlights, game_id, snapshot))
+    try:
+        await _run_bounded(semaphore, lambda: snapshot.feed)
+    except Exception:
+        videoTask.cancel()
+        raise
+
+    ibiData = get_inning_by_inning_comms(game_id, snapshot)
+    lineScoreText = get_linescore_text(game_id, snapshot)
+    playerLineup = get_game_players_info_text(game_id, snapshot)
+    videoData = await videoTask
 
     formattedResult ="Game ID : " + str(game_id) + "\n\n"+ "Player Data with ID " + "\n\n" +playerLineup + "\n\n"+ "Line Score Information" + "\n" + lineScoreText + "\n\n" + "Inning by Inning Commentary: \n" + ibiData + "\n\n" + " \n Video Highlights: \n " + videoData
 
     
     return formattedResult
 
+def get_game_full_Info_qa(game_id, snapshot=None):
+    return run_coroutine_sync(get_game_full_Info_qa_async(game_id, snapshot))
+
 def textifyBothTeamLeaders(home_team_id, away_team_id, season, gameType):
     homeTeamLeaders = textify_team_leaders(team_id=home_team_id, season=season, gameType=gameType)
     awayTeamLeaders = textify_team_leaders(team_id=away_team_id, season=season, gameType=gameType)
     return homeTeamLeaders + "\n\n" + awayTeamLeaders
 
-def get_full_llm_feed(game_id, focus_players=[], focus_areas=[], focus_teams=[], language="en"):
+async def get_full_llm_feed_async(game_id, focus_players=[], focus_areas=[], focus_teams=[], language="en", snapshot=None):
+    """
+    Build the rewind prompt data. The upstream calls (live feed, highlights and both teams' leaders) are
+    fanned out with at most FEED_FETCH_CONCURRENCY in flight, and the parts are joined in prompt order.
+    """
+    snapshot = get_game_snapshot(game_id, snapshot)
+    semaphore = asyncio.Semaphore(FEED_FETCH_CONCURRENCY)
 
-    bxData = getBoxScore(game_id)
-    bxDataDict = statsapi.boxscore_data(game_id)
+    # the highlights do not depend on the live feed, so start them right away
+    videoTask = asyncio.create_task(_run_bounded(semaphore, textifyGameVideoHighlights, game_id, snapshot))
+    try:
+        bxDataDict = await _run_bounded(semaphore, lambda: snapshot.boxscore)
+    except Exception:
+        videoTask.cancel()
+        raise
 
-    season = statsapi.get('game', {'gamePk': 634594})["gameData"]["datetime"]["officialDate"].split("-")[0]
-    gameType = statsapi.get('game', {'gamePk': 634594})["gameData"]["game"]["type"]
+    season = snapshot.season
+    gameType = snapshot.game_type
     # teams = textify_game_teams_names_and_ids(bxDataDict)
     teamIds = get_game_teams_ids_via_box(bxDataDict)
+    leaderTasks = [
+        asyncio.create_task(_run_bounded(semaphore, textify_team_leaders, team_id=teamId, season=season, gameType=gameType))
+        for teamId in (teamIds["home_team_id"], teamIds["away_team_id"])
+    ]
 
-    #bx data is a string that  contains special characer that need to be applied, like \n should be replaced with new line
-    bxData = bxData.replace("\n", "\n ")
-
-    bxData = str(bxData)
-    ibiData = get_inning_by_inning_comms(game_id)
-    videoData = textifyGameVideoHighlights(game_id)
+    # everything below reads the already downloaded live feed
+    ibiData = get_inning_by_inning_comms(game_id, snapshot)
     userPreference = process_user_preference(focus_players, focus_areas, focus_teams)
-    lineScoreText = get_linescore_text(game_id)
-    playerLineup = get_game_players_info_text(game_id)
-    teamsLeaders = textifyBothTeamLeaders(teamIds["home_team_id"], teamIds["away_team_id"], season, gameType)
-
+    lineScoreText = get_linescore_text(game_id, snapshot)
+    playerLineup = get_game_players_info_text(game_id, snapshot)
     languagePrompt = process_user_language(language)
 
-    formattedResultExtended = userPreference + "\n" + "Box Score: \n" + bxData + "\n\n"+ "Player Data with ID " + "\n\n" +playerLineup + "\n\n"+ "Line Score Information" + "\n" + lineScoreText + "\n\n" + "Inning by Inning Commentary: \n" + ibiData + "\n\n" + " \n Video Highlights: \n " + videoData
+    homeTeamLeaders, awayTeamLeaders, videoData = await asyncio.gather(*leaderTasks, videoTask)
+    teamsLeaders = homeTeamLeaders + "\n\n" + awayTeamLeaders
+
     formattedResult ="Game ID : " + str(game_id) + "\n\n" +userPreference + "\n\n"+"\n\n"+teamsLeaders + languagePrompt+ "\n\n"+ "Player Data with ID " + "\n\n" +playerLineup + "\n\n"+ "Line Score Information" + "\n" + lineScoreText + "\n\n" + "Inning by Inning Commentary: \n" + ibiData +"\n\n" + " \n Video Highlights: \n " + videoData 
 
     save_to_file(formattedResult, "part.txt")
     return formattedResult
 
+def get_full_llm_feed(game_id, focus_players=[], focus_areas=[], focus_teams=[], language="en", snapshot=None):
+    return run_coroutine_sync(get_full_llm_feed_async(game_id, focus_players, focus_areas, focus_teams, language, snapshot))
+
 
 
 
@@ -405,19 +618,14 @@ def process_user_preference(focus_players, focus_areas, focus_teams):
     
     return textForm
 
-def get_linescore(game_id):
+def get_linescore(game_id, snapshot=None):
     """
     Get the inning-by-inning linescore for a specific game using the game ID.
     """
-    data = fetch_game_data(game_id)
-    if data:
-        linescore = extract_linescore(data)
-        return linescore
-    else:
-        raise ValueError("Failed to fetch game data.")
+    return get_game_snapshot(game_id, snapshot).linescore
 
-def get_linescore_text(game_id):
-    textData = statsapi.linescore(game_id)
+def get_linescore_text(game_id, snapshot=None):
+    textData = get_game_snapshot(game_id, snapshot).linescore_text
     if textData:
         return textData
     else:
@@ -481,15 +689,22 @@ def extract_linescore(data):
     return result
 
 
-def uicomponentProcessor(uicomponent):
+def uicomponentProcessor(uicomponent, snapshot=None):
+    """
+    Resolve a UI component requested by the model into the data the frontend renders.
+    Pass the request's GameSnapshot so components of the same game share its downloads.
+    """
     try:
+        if snapshot is not None and str(snapshot.game_id) != str(uicomponent.get("gameId", snapshot.game_id)):
+            snapshot = None
+
         if uicomponent["type"] == "LineBox":
             return {
                 "type": "LineBox",
                 "data": {
                     "gameId": uicomponent["gameId"],
                     "currentInning": uicomponent["currentInning"],
-                    "score": get_linescore(uicomponent["gameId"])
+                    "score": get_linescore(uicomponent["gameId"], snapshot)
                 }
             }
         elif uicomponent["type"] == "PlayerCard":
@@ -504,7 +719,7 @@ def uicomponentProcessor(uicomponent):
         elif uicomponent["type"] == "GameInfoCard":
             homeTeamId = uicomponent["homeTeamId"]
             awayTeamId = uicomponent["awayTeamId"]
-            gameInfo = get_game_info(uicomponent["gameId"])
+            gameInfo = get_game_info(uicomponent["gameId"], snapshot)
             return {
                 "type": "GameInfoCard",
                 "gameId": uicomponent["gameId"],
@@ -520,7 +735,7 @@ def uicomponentProcessor(uicomponent):
             }
         elif uicomponent["type"] == "HighlightVideo":
             vidIndex = uicomponent["index"]
-            vidObj = get_game_video_at_index(uicomponent["gameId"], vidIndex)
+            vidObj = get_game_video_at_index(uicomponent["gameId"], vidIndex, snapshot)
 
             vidHeadline = vidObj["headline"] if "headline" in vidObj else "Not Available"
             vidTitle = vidObj["title"] if "title" in vidObj else "Not Available"
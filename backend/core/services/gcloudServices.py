@@ -1,30 +1,71 @@
-from google.cloud import storage
-from google.cloud import firestore
+import base64
+import hashlib
 from datetime import datetime
 
-# Initialize Firestore client
-db = firestore.Client()
+from core.services.cloudClientService import get_bucket, get_firestore_client
+
+# Resumable uploads send (and buffer) this much at a time, GCS needs a multiple of 256 KB
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+
+# Firestore query directions
+ASCENDING = "ASCENDING"
+DESCENDING = "DESCENDING"
 
 
 def upload_audio_to_gcs(audio_path, bucket_name, file_name):
     """Uploads an audio file to Google Cloud Storage."""
-    storage_client = storage.Client()
-    bucket = storage_client.bucket(bucket_name)
+    bucket = get_bucket(bucket_name)
     blob = bucket.blob(file_name)
     blob.upload_from_filename(audio_path)
     return blob.public_url
 
 
+def upload_audio_bytes_to_gcs(audio_bytes, bucket_name, file_name, content_type="audio/mpeg"):
+    """Uploads in-memory audio to Google Cloud Storage."""
+    bucket = get_bucket(bucket_name)
+    blob = bucket.blob(file_name)
+    blob.upload_from_string(audio_bytes, content_type=content_type)
+    return blob.public_url
+
+
+def upload_stream_to_gcs(chunks, bucket_name, file_name, content_type, expected_size=None, predefined_acl=None):
+    """
+    Upload an iterator of byte chunks with a resumable upload (blob.open buffers and sends
+    UPLOAD_CHUNK_SIZE at a time), and verify that GCS stored exactly what was read (MD5, and size
+    when expected_size is given). The object is deleted and ValueError raised when the check fails.
+    """
+    bucket = get_bucket(bucket_name)
+    blob = bucket.blob(file_name)
+    md5 = hashlib.md5()
+    size = 0
+    # on an exception the writer cancels the resumable upload instead of finalizing it
+    with blob.open("wb", chunk_size=UPLOAD_CHUNK_SIZE, content_type=content_type, predefined_acl=predefined_acl) as writer:
+        for chunk in chunks:
+            if chunk:
+                md5.update(chunk)
+                size += len(chunk)
+                writer.write(chunk)
+
+    # the writer does not update the blob metadata, fetch what GCS stored
+    blob.reload()
+    local_md5 = base64.b64encode(md5.digest()).decode("ascii")
+    if blob.md5_hash != local_md5 or (expected_size is not None and size != expected_size):
+        blob.delete()
+        raise ValueError(
+            f"Upload of {file_name} failed verification: {size} bytes read (expected {expected_size}), "
+            f"md5 {local_md5} but GCS has {blob.md5_hash}"
+        )
+    return blob
 
 
 def getLatestComments(count, gameId):
     """
     Retrieves the latest 'count' comments for a given gameId from Firestore.
     """
-    comments_ref = db.collection("games").document(gameId).collection("comments")
+    comments_ref = get_firestore_client().collection("games").document(gameId).collection("comments")
     
     # Fetch latest 'count' comments ordered by timestamp (descending order)
-    comments = comments_ref.order_by("date", direction=firestore.Query.DESCENDING).limit(count).stream()
+    comments = comments_ref.order_by("date", direction=DESCENDING).limit(count).stream()
 
     return {
         "gameId": gameId,
@@ -41,7 +82,7 @@ def addNewComment(comment, gameId, username):
     """
     Adds a new comment to Firestore under the gameId.
     """
-    comments_ref = db.collection("games").document(gameId).collection("comments")
+    comments_ref = get_firestore_client().collection("games").document(gameId).collection("comments")
     
     new_comment = {
         "date": datetime.utcnow(),  # Firestore uses datetime format
@@ -59,9 +100,9 @@ def fetchPreviousMessages(sessionId):
     Retrieves the previous conversation messages for a given sessionId from Firestore.
     The messages are returned as a list of dictionaries with keys "role" and "parts".
     """
-    messages_ref = db.collection("sessions").document(sessionId).collection("messages")
+    messages_ref = get_firestore_client().collection("sessions").document(sessionId).collection("messages")
     # Order messages by timestamp ascending (oldest first)
-    messages = messages_ref.order_by("timestamp", direction=firestore.Query.ASCENDING).stream()
+    messages = messages_ref.order_by("timestamp", direction=ASCENDING).stream()
     result = []
     for msg in messages:
         data = msg.to_dict()
@@ -75,7 +116,7 @@ def addMessageToSession(sessionId, role, parts):
     """
     Adds a new message to the Firestore session history.
     """
-    messages_ref = db.collection("sessions").document(sessionId).collection("messages")
+    messages_ref = get_firestore_client().collection("sessions").document(sessionId).collection("messages")
     message = {
         "role": role,
         "parts": parts,
@@ -89,7 +130,7 @@ def updateSessionMessage(sessionId, message_id, new_data):
     Updates a specific message in the session history in Firestore.
     new_data should be a dict containing the fields to update.
     """
-    message_ref = db.collection("sessions").document(sessionId).collection("messages").document(message_id)
+    message_ref = get_firestore_client().collection("sessions").document(sessionId).collection("messages").document(message_id)
     message_ref.update(new_data)
     return new_data
 
@@ -97,7 +138,7 @@ def deleteSessionHistory(sessionId):
     """
     Deletes all messages in a given session from Firestore.
     """
-    messages_ref = db.collection("sessions").document(sessionId).collection("messages")
+    messages_ref = get_firestore_client().collection("sessions").document(sessionId).collection("messages")
     docs = messages_ref.stream()
     for doc in docs:
         doc.reference.delete()
@@ -0,0 +1,165 @@
+import logging
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from core.config import (
+    HIGHLIGHT_WARMER_WORKERS,
+    HIGHLIGHT_WARMER_INTERVAL,
+    HIGHLIGHT_WARMER_LOOKBACK_DAYS,
+    HIGHLIGHT_WARMER_INDEX_SCENES,
+    HIGHLIGHT_WARMER_PROGRESS_PATH,
+)
+from core.services.gameServices import serializeVideoInformation
+from core.services.scheduleIndexService import get_indexed_game_pks
+from core.services.vidLLMServices import download_and_upload_mlb_video, get_video_scene_index
+
+logger = logging.getLogger(__name__)
+
+# A game whose videos keep failing is given up after this many failed rounds
+HIGHLIGHT_WARMER_MAX_ATTEMPTS = 3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS warmed_games (
+    game_pk INTEGER PRIMARY KEY,
+    complete INTEGER NOT NULL,
+    attempts INTEGER NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS warmed_videos (
+    url TEXT PRIMARY KEY,
+    game_pk INTEGER NOT NULL,
+    warmed_at REAL NOT NULL
+);
+"""
+
+
+@contextmanager
+def _connect():
+    connection = sqlite3.connect(HIGHLIGHT_WARMER_PROGRESS_PATH, timeout=30)
+    try:
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.executescript(_SCHEMA)
+        with connection:
+            yield connection
+    finally:
+        connection.close()
+
+
+def warm_video(url):
+    """
+    Mirror one highlight video to GCS (and index its scenes when HIGHLIGHT_WARMER_INDEX_SCENES is set),
+    the same way a rewind would on first use.
+    """
+    download_and_upload_mlb_video(url, url.split("/")[-1])
+    if HIGHLIGHT_WARMER_INDEX_SCENES:
+        get_video_scene_index(url)
+
+
+class HighlightWarmer:
+    """
+    Background job that mirrors the highlight videos of games that went Final before anyone asks for
+    their rewind. Every HIGHLIGHT_WARMER_INTERVAL seconds it looks for Final games of the last
+    HIGHLIGHT_WARMER_LOOKBACK_DAYS days in the schedule index and warms their videos on a pool of
+    HIGHLIGHT_WARMER_WORKERS threads. Games stay pending for the whole lookback window and their
+    highlights are listed again every round, since MLB keeps publishing videos after the final out.
+    Progress is kept per video and per game in SQLite, so a restart resumes where it stopped.
+    """
+
+    def __init__(self, workers=HIGHLIGHT_WARMER_WORKERS, interval=HIGHLIGHT_WARMER_INTERVAL):
+        self.workers = workers
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="highlight-warmer", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        # the first round also runs right away, to resume work left by a previous process
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.warning(f"Highlight warmer round failed: {e}")
+            self._stop.wait(self.interval)
+
+    def pending_games(self):
+        """
+        Final games of the lookback window that were not given up.
+        """
+        today = datetime.now().date()
+        start_date = (today - timedelta(days=HIGHLIGHT_WARMER_LOOKBACK_DAYS)).isoformat()
+        game_pks = get_indexed_game_pks(start_date, today.isoformat(), state="Final")
+        with _connect() as connection:
+            done = {
+                row["game_pk"] for row in connection.execute(
+                    "SELECT game_pk FROM warmed_games WHERE attempts >= ?",
+                    (HIGHLIGHT_WARMER_MAX_ATTEMPTS,),
+                )
+            }
+        return [game_pk for game_pk in game_pks if game_pk not in done]
+
+    def run_once(self):
+        """
+        Warm every pending game once. Returns the number of videos warmed in this round.
+        """
+        warmed = 0
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="highlight-warmer") as executor:
+            for game_pk in self.pending_games():
+                if self._stop.is_set():
+                    break
+                try:
+                    count, complete, failed = self._warm_game(game_pk, executor)
+                except Exception as e:
+                    logger.warning(f"Could not list the highlights of game {game_pk}: {e}")
+                    count, complete, failed = 0, False, True
+                warmed += count
+                _record_game(game_pk, complete, failed)
+        return warmed
+
+    def _warm_game(self, game_pk, executor):
+        urls = [video["link"] for video in serializeVideoInformation(game_pk)]
+        with _connect() as connection:
+            done = {row["url"] for row in connection.execute("SELECT url FROM warmed_videos WHERE game_pk = ?", (game_pk,))}
+        todo = [url for url in dict.fromkeys(urls) if url not in done]
+
+        futures = {executor.submit(warm_video, url): url for url in todo}
+        warmed = 0
+        for future in as_completed(futures):
+            url = futures[future]
+            try:
+                future.result()
+            except Exception as e:
+                logger.warning(f"Could not warm highlight {url} of game {game_pk}: {e}")
+                continue
+            # recorded one by one, so a restart does not redo finished videos
+            with _connect() as connection:
+                connection.execute("INSERT OR REPLACE INTO warmed_videos VALUES (?, ?, ?)", (url, game_pk, time.time()))
+            warmed += 1
+
+        logger.info(f"Warmed {warmed} of {len(todo)} highlights of game {game_pk}.")
+        # complete only means every video listed so far is warmed, the game is listed again next round
+        return warmed, warmed == len(todo), warmed < len(todo)
+
+
+def _record_game(game_pk, complete, failed):
+    # only failed rounds count as attempts, waiting for highlights to be published does not
+    with _connect() as connection:
+        connection.execute(
+            "INSERT INTO warmed_games VALUES (?, ?, ?, ?) ON CONFLICT(game_pk) DO UPDATE SET "
+            "complete = excluded.complete, attempts = attempts + excluded.attempts, updated_at = excluded.updated_at",
+            (game_pk, int(complete), int(failed), time.time()),
+        )
+
+
+highlight_warmer = HighlightWarmer()
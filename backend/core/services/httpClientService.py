@@ -0,0 +1,95 @@
+import asyncio
+import logging
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+STATS_API_BASE_URL = "https://statsapi.mlb.com/api"
+
+# (connect, read) timeouts in seconds, used when a caller does not pass its own
+DEFAULT_TIMEOUT = (3.05, 20)
+MAX_RETRIES = 3
+# retry n waits BACKOFF_FACTOR * 2^(n-1) seconds plus up to BACKOFF_JITTER seconds of random jitter
+BACKOFF_FACTOR = 0.3
+BACKOFF_JITTER = 0.3
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+POOL_MAXSIZE = 32
+
+
+def _build_retry():
+    retry_options = dict(
+        total=MAX_RETRIES,
+        backoff_factor=BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(["GET", "HEAD"]),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    try:
+        return Retry(backoff_jitter=BACKOFF_JITTER, **retry_options)
+    except TypeError:
+        # urllib3 < 2 has no jitter option
+        return Retry(**retry_options)
+
+
+def _build_session():
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_MAXSIZE, max_retries=_build_retry())
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({
+        "Accept": "application/json",
+        "Accept-Encoding": "gzip, deflate",
+        "Connection": "keep-alive",
+    })
+    return session
+
+
+# One pooled keep-alive session for the whole process, shared by every thread
+_session = _build_session()
+
+
+def get_session():
+    return _session
+
+
+def http_get(url, params=None, timeout=DEFAULT_TIMEOUT, **kwargs):
+    """
+    GET through the shared pooled session. Connection errors and 429/5xx answers are retried with
+    jittered exponential backoff. Returns the response without checking its status.
+    """
+    return _session.get(url, params=params, timeout=timeout, **kwargs)
+
+
+def get_json(url, params=None, timeout=DEFAULT_TIMEOUT):
+    """
+    GET a JSON document through the shared pooled session.
+    Raises requests.exceptions.RequestException when the request fails or the status is not 2xx.
+    """
+    response = http_get(url, params=params, timeout=timeout)
+    response.raise_for_status()
+    return response.json()
+
+
+def stats_api_get(path, params=None, timeout=DEFAULT_TIMEOUT):
+    """
+    GET a Stats API path such as "v1/teams" or "v1.1/game/{gamePk}/feed/live".
+    """
+    return get_json(f"{STATS_API_BASE_URL}/{path.lstrip('/')}", params=params, timeout=timeout)
+
+
+async def async_get_json(url, params=None, timeout=DEFAULT_TIMEOUT):
+    """
+    Async variant of get_json. Runs on a worker thread so it shares the same connection pool.
+    """
+    return await asyncio.to_thread(get_json, url, params, timeout)
+
+
+async def async_stats_api_get(path, params=None, timeout=DEFAULT_TIMEOUT):
+    """
+    Async variant of stats_api_get.
+    """
+    return await asyncio.to_thread(stats_api_get, path, params, timeout)
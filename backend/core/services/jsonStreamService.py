@@ -0,0 +1,82 @@
+import json
+import re
+
+_SECTIONS_START = re.compile(r'"Sections"\s*:\s*\[')
+
+
+class SectionStreamParser:
+    """
+    Incremental parser for a streamed {"Sections": [ {...}, {...} ]} document.
+    feed() takes the next piece of text and returns the Sections items completed by it, so each
+    section can be used as soon as its closing brace arrives. Text around the document (such as
+    markdown code fences) is ignored.
+    """
+
+    def __init__(self):
+        self._text = ""
+        self._pos = None  # scan position inside the Sections array, None until the array starts
+        self._start = None  # start of the item being read
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self.done = False
+        self.count = 0
+
+    def feed(self, chunk):
+        self._text += chunk
+        if self.done:
+            return []
+        if self._pos is None:
+            match = _SECTIONS_START.search(self._text)
+            if match is None:
+                return []
+            self._pos = match.end()
+
+        sections = []
+        text = self._text
+        for i in range(self._pos, len(text)):
+            char = text[i]
+            if self._start is None:
+                # between two items: only whitespace, commas, the next item or the end of the array
+                if char == "{":
+                    self._start = i
+                    self._depth = 1
+                elif char == "]":
+                    self.done = True
+                    self._pos = i + 1
+                    return sections
+                continue
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    sections.append(json.loads(text[self._start:i + 1]))
+                    self.count += 1
+                    self._start = None
+        self._pos = len(text)
+        return sections
+
+    def text(self):
+        return self._text
+
+
+def parse_sections_document(text):
+    """
+    Parse a complete {"Sections": [...]} response, with or without surrounding code fences.
+    """
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.split("\n", 1)[1] if "\n" in text else ""
+        text = text.rsplit("```", 1)[0]
+    return json.loads(text)["Sections"]
@@ -0,0 +1,186 @@
+import copy
+import logging
+import threading
+import time
+
+from core.services.httpClientService import stats_api_get
+
+logger = logging.getLogger(__name__)
+
+# Seconds between two diffPatch polls of a tracked game
+LIVE_POLL_INTERVAL = 10
+# A tracked game nobody asked for during this many seconds stops being polled
+LIVE_IDLE_TIMEOUT = 300
+
+FEED_PATH = "v1.1/game/{game_pk}/feed/live"
+DIFF_PATCH_PATH = FEED_PATH + "/diffPatch"
+
+
+def _unescape(token):
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def _split_path(path):
+    if path == "":
+        return []
+    return [_unescape(token) for token in path.split("/")[1:]]
+
+
+def _resolve(doc, parts):
+    for key in parts:
+        doc = doc[int(key)] if isinstance(doc, list) else doc[key]
+    return doc
+
+
+def _patch_in(container, parts, op, value, copied):
+    # containers on the changed path are copied once per patch; everything else stays shared
+    if id(container) not in copied:
+        container = copy.copy(container)
+        copied[id(container)] = container
+
+    key = parts[0]
+    if isinstance(container, list):
+        key = len(container) if key == "-" else int(key)
+
+    if len(parts) > 1:
+        container[key] = _patch_in(container[key], parts[1:], op, value, copied)
+    elif op == "add" and isinstance(container, list):
+        container.insert(key, value)
+    elif op in ("add", "replace"):
+        container[key] = value
+    elif op == "remove":
+        del container[key]
+    return container
+
+
+def _apply_operation(doc, operation, copied):
+    op = operation["op"]
+    parts = _split_path(operation["path"])
+
+    if op == "test":
+        if _resolve(doc, parts) != operation["value"]:
+            raise ValueError(f"Patch test failed at {operation['path']}")
+        return doc
+    if op in ("move", "copy"):
+        from_parts = _split_path(operation["from"])
+        value = _resolve(doc, from_parts)
+        if op == "move":
+            doc = _patch_in(doc, from_parts, "remove", None, copied)
+        else:
+            value = copy.deepcopy(value)
+        op = "add"
+    else:
+        value = operation.get("value")
+
+    if not parts:
+        # an operation on the root replaces the whole document
+        return value
+    return _patch_in(doc, parts, op, value, copied)
+
+
+def apply_json_patch(doc, operations):
+    """
+    Apply a list of RFC 6902 operations and return the patched document.
+    doc itself is not modified: only the containers on the changed paths are copied, so readers
+    still holding the previous document are safe and the cost follows the size of the change.
+    """
+    copied = {}
+    for operation in operations:
+        doc = _apply_operation(doc, operation, copied)
+    return doc
+
+
+def get_feed_timecode(feed):
+    return feed.get("metaData", {}).get("timeStamp")
+
+
+class LiveGameTracker:
+    """
+    Keeps the latest live feed of one in-progress game and polls diffPatch in the background.
+    All requests for the game read the same feed; treat it as read-only.
+    """
+
+    def __init__(self, game_pk, feed):
+        self.game_pk = game_pk
+        self._feed = feed
+        self._last_access = time.time()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"live-feed-{game_pk}", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def get_feed(self):
+        self._last_access = time.time()
+        return self._feed
+
+    def poll(self):
+        """
+        Fetch the changes since the current timecode and swap in the patched feed.
+        """
+        feed = self._feed
+        changes = stats_api_get(
+            DIFF_PATCH_PATH.format(game_pk=self.game_pk),
+            {"startTimecode": get_feed_timecode(feed)},
+        )
+
+        if isinstance(changes, dict):
+            # the API sends the full document back when the diff would be larger than it
+            self._feed = changes
+            return
+        try:
+            for change in changes:
+                feed = apply_json_patch(feed, change.get("diff", []))
+        except (KeyError, IndexError, TypeError, ValueError) as e:
+            logger.warning(f"Could not apply diffPatch for game {self.game_pk}, resyncing full feed: {e}")
+            feed = stats_api_get(FEED_PATH.format(game_pk=self.game_pk))
+        self._feed = feed
+
+    def _run(self):
+        try:
+            while not self._stop.wait(LIVE_POLL_INTERVAL):
+                if time.time() - self._last_access > LIVE_IDLE_TIMEOUT:
+                    break
+                try:
+                    self.poll()
+                except Exception as e:
+                    logger.warning(f"Live feed poll failed for game {self.game_pk}: {e}")
+                    continue
+                if self._feed.get("gameData", {}).get("status", {}).get("abstractGameState") != "Live":
+                    break
+        finally:
+            _remove_tracker(self)
+
+
+_trackers = {}
+_trackers_lock = threading.Lock()
+
+
+def _remove_tracker(tracker):
+    with _trackers_lock:
+        if _trackers.get(str(tracker.game_pk)) is tracker:
+            del _trackers[str(tracker.game_pk)]
+
+
+def get_live_feed(game_pk):
+    """
+    Get the tracked feed of a live game, or None when the game is not tracked.
+    """
+    with _trackers_lock:
+        tracker = _trackers.get(str(game_pk))
+    return tracker.get_feed() if tracker else None
+
+
+def track_live_game(game_pk, feed):
+    """
+    Start one shared poller for a live game, seeded with a full feed. Does nothing if it is already tracked.
+    """
+    with _trackers_lock:
+        if str(game_pk) in _trackers:
+            return
+        tracker = LiveGameTracker(game_pk, feed)
+        _trackers[str(game_pk)] = tracker
+    tracker.start()
@@ -1,6 +1,7 @@
 import google.generativeai as genai
 import json
 from core.services.gcloudServices import fetchPreviousMessages, updateSessionMessage, deleteSessionHistory, addMessageToSession
+from core.services.gameServices import get_game_full_Info_qa
 
 genai.configure(api_key="")# put your gemini api key here for testing for production use environment variables
 model = genai.GenerativeModel("gemini-1.5-flash")
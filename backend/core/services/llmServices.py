@@ -8,7 +8,7 @@ from core.services.gameServices import get_game_video_highlights, textify_game_t
 from core.services.voiceGenServices import invokeElevenLabGeneration
 from core.services.gcloudServices import *
 from mutagen.mp3 import MP3
-from vertexai.generative_models import GenerativeModel, Part
+from core.services.jsonStreamService import SectionStreamParser, parse_sections_document
 systemMessage = """
 **Task Overview:**  
 Generate a **two-minute (~250 words)** professional-style commentary **rewind** of an MLB game, making it sound like a high-quality sports recap. The narration should be **engaging, concise, and structured**, starting with a greeting, followed by a **quick game recap**, and then focusing on the **key plays and highlights**.  
@@ -153,8 +153,8 @@ Data :
 
 
 
-def promptProcessor(game_id, focus_players, focus_areas, focus_teams, language):
-    feed = get_full_llm_feed(game_id, focus_players, focus_areas, focus_teams, language)
+def promptProcessor(game_id, focus_players, focus_areas, focus_teams, language, snapshot=None):
+    feed = get_full_llm_feed(game_id, focus_players, focus_areas, focus_teams, language, snapshot)
 
     #make it a prompt template with sys instructions etc. 
 
@@ -186,6 +186,29 @@ def generateCommentaryWithGemini(data, model):
     return result
 
 
+def streamCommentaryWithGemini(data, model):
+    """
+    Same generation as generateCommentaryWithGemini, in streaming mode: yields each section of the
+    "Sections" array as soon as the model has finished writing it.
+    """
+    contents = [
+        {
+            "role": "user",  # Gemini only accepts "user" and "model" roles
+            "parts": [{"text": systemMessage + "\n\n" + data}]
+        }
+    ]
+
+    parser = SectionStreamParser()
+    for chunk in model.generate_content(contents, stream=True):
+        for section in parser.feed(chunk.text):
+            yield section
+
+    if parser.count == 0:
+        # nothing could be read incrementally, fall back to parsing the whole answer
+        for section in parse_sections_document(parser.text()):
+            yield section
+
+
 
 # model = initGemini()
 # resultant = generateCommentaryWithGemini(promptProcessor("634594", ["Nolan Arenado", "Paul Goldschmidt"], ["batting", "pitching"], ["St. Louis Cardinals", "Miami Marlins"]), model)
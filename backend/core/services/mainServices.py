@@ -1,14 +1,19 @@
-from core.services.gameServices import uicomponentProcessor
-from core.services.gcloudServices import upload_audio_to_gcs
-from core.services.llmServices import initGemini, generateCommentaryWithGemini, promptProcessor
+from core.services.gameServices import uicomponentProcessor, GameSnapshot
+from core.services.gcloudServices import upload_audio_bytes_to_gcs
+from core.services.llmServices import initGemini, streamCommentaryWithGemini, promptProcessor
 import json
-from mutagen.mp3 import MP3
 from core.services.llmServices import save_to_file
-from core.services.redisCacheService import get_cached_data, cache_data
-from core.services.voiceGenServices import invokeElevenLabGeneration
+from core.services.rewindCacheService import build_rewind_cache_key, get_cached_rewind, cache_rewind
+from core.services.voiceGenServices import synthesizeAudio, getTTSCacheKey
+from core.services.ttsCacheService import get_cached_tts, cache_tts, tts_audio_name
+from core.services.mp3ProbeService import get_mp3_duration
 from core.services.vidLLMServices import generate_video_timestamps
+from core.services.singleFlightService import SingleFlight
 
 from datetime import datetime
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 def format_timestamp(timestamp):
     try:
@@ -25,17 +30,163 @@ def format_timestamp(timestamp):
 
 
 
-def get_game_commentary(game_id, focus_players, focus_areas, focus_teams, music_url, language):
+# identical rewinds requested at the same time share one generation
+rewindFlights = SingleFlight()
+# and so do identical narrations
+ttsFlights = SingleFlight()
+
+# Rewind sections run on one process-wide pool. Each provider also has its own limit of calls in
+# flight across all rewinds, so a burst of sections does not hit a provider's rate limits.
+SECTION_WORKERS = 8
+sectionExecutor = ThreadPoolExecutor(max_workers=SECTION_WORKERS, thread_name_prefix="rewind-section")
+providerLimits = {
+    "elevenlabs": threading.BoundedSemaphore(4),
+    "gcs": threading.BoundedSemaphore(8),
+    "statsapi": threading.BoundedSemaphore(6),
+    "gemini_video": threading.BoundedSemaphore(3),
+}
+
+
+def synthesize_narration(narration, language):
+    """
+    Get the public url and duration of the narration audio. Audio already synthesized with the same
+    text, voice and TTS settings is reused from the TTS cache without calling ElevenLabs or uploading.
+    """
+    key = getTTSCacheKey(narration, language)
+    cached = get_cached_tts(key)
+    if cached is not None:
+        return cached["url"], cached["duration"]
+    return ttsFlights.do(key, lambda: generate_narration_audio(key, narration, language))
+
+
+def generate_narration_audio(key, narration, language):
+    # the audio stays in memory from the TTS stream to the upload
+    with providerLimits["elevenlabs"]:
+        audioBytes = synthesizeAudio(narration, language)
+    mp3Length = get_mp3_duration(audioBytes)
+
+    with providerLimits["gcs"]:
+        public_url = upload_audio_bytes_to_gcs(audioBytes, "audiocommentary", tts_audio_name(key))
+
+    cache_tts(key, public_url, mp3Length)
+    return public_url, mp3Length
+
+
+def process_section(section, language, snapshot):
+    """
+    Turn one generated section into its client data: narration audio, UI component and, for
+    highlight videos, the video window matching the narration.
+    """
+    narration = section["narration"]
+    public_url, mp3Length = synthesize_narration(narration, language)
     
-    model = initGemini()
-    resultant = generateCommentaryWithGemini(promptProcessor(game_id=game_id, focus_players=focus_players,focus_areas=focus_areas, focus_teams=focus_teams, language=language), model)
-    resultant = resultant.strip()
-    resultantJson = json.loads(resultant)
-    cacheKey = game_id + "_" + "_".join(focus_players) + "_" + "_".join(focus_areas) + "_" + "_".join(focus_teams)+ "_" + language
     
-    if(get_cached_data(cacheKey) is not None):
-        return json.loads(get_cached_data(cacheKey))
+    dialogueComponent = {
+                "type":"Dialogue",
+                "url": public_url,
+                "duration" : mp3Length
+            }
+    if(section["UIComponent"] is None):
+        print("UIComponent is None")
+        print(section)
+    with providerLimits["statsapi"]:
+        uicomponent = uicomponentProcessor(section["UIComponent"], snapshot)
+    
+    currentSection = {
+        "section_id" : section["id"],
+        "section_duration": mp3Length,
+        "section_components":[
+            dialogueComponent,
+            uicomponent
+        ]
+    }
     
+    if uicomponent["type"] == "HighlightVideo":
+        try:
+            with providerLimits["gemini_video"]:
+                vidStamps = json.loads((generate_video_timestamps(uicomponent["data"]["url"], narration, mp3Length)))
+            vidStamps["start"] = format_timestamp(vidStamps["start"])
+            vidStamps["end"] = format_timestamp(vidStamps["end"])
+            uicomponent["data"]["vid_time"] = vidStamps
+
+           
+            #vidstamps is of the form {"start": HH:MM:SS, "end": HH:MM:SS}
+            convertStartToSeconds = lambda x: int(x.split(":")[0])*3600 + int(x.split(":")[1])*60 + int(x.split(":")[2])
+            start = convertStartToSeconds(vidStamps["start"])
+            end = convertStartToSeconds(vidStamps["end"])
+            vidDuration = end - start
+            currentSection["section_duration"] = max(vidDuration, mp3Length)
+        except Exception as e:
+            print(uicomponent)
+            print(e)
+
+    return currentSection
+
+def get_game_commentary(game_id, focus_players, focus_areas, focus_teams, music_url, language):
+    cacheKey = build_rewind_cache_key(game_id, focus_players, focus_areas, focus_teams, music_url, language)
+
+    # the cache is checked before any model, TTS or Stats API work
+    cached = get_cached_rewind(cacheKey)
+    if cached is not None:
+        return cached
+
+    return rewindFlights.do(cacheKey, lambda: generate_game_commentary(cacheKey, game_id, focus_players, focus_areas, focus_teams, music_url, language))
+
+
+def iter_rewind_sections(game_id, focus_players, focus_areas, focus_teams, language):
+    """
+    Generate the rewind script and yield the client data of each section in section order, as soon
+    as it and all sections before it are done. The script is streamed from Gemini and every section
+    starts processing as soon as the model has written it, while later sections are still generated.
+    """
+    # every builder of this request reads the game from one snapshot instead of refetching it
+    snapshot = GameSnapshot(game_id)
+    model = initGemini()
+    prompt = promptProcessor(game_id=game_id, focus_players=focus_players,focus_areas=focus_areas, focus_teams=focus_teams, language=language, snapshot=snapshot)
+
+    # the script is read on its own thread, which hands the submitted sections over in order
+    pending = queue.Queue()
+    stopped = threading.Event()
+
+    def submitSections():
+        try:
+            for section in streamCommentaryWithGemini(prompt, model):
+                if stopped.is_set():
+                    break
+                pending.put(sectionExecutor.submit(process_section, section, language, snapshot))
+        except Exception as e:
+            pending.put(e)
+        finally:
+            pending.put(None)
+
+    threading.Thread(target=submitSections, name=f"rewind-script-{game_id}", daemon=True).start()
+
+    try:
+        while True:
+            item = pending.get()
+            if item is None:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item.result()
+    finally:
+        # the consumer stopped early (error or closed stream), drop the sections not started yet
+        stopped.set()
+        while True:
+            try:
+                item = pending.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None and not isinstance(item, Exception):
+                item.cancel()
+
+
+def generate_game_commentary(cacheKey, game_id, focus_players, focus_areas, focus_teams, music_url, language):
+    # another server process may have cached the same rewind since the first lookup
+    cached = get_cached_rewind(cacheKey)
+    if cached is not None:
+        return cached
+
     clientData = {
         "id": game_id,
         "total_duration":0,
@@ -44,63 +195,50 @@ def get_game_commentary(game_id, focus_players, focus_areas, focus_teams, music_
            
         ]
     }
-    for section in resultantJson["Sections"]:
-        
-
-        narration = section["narration"]
-        audioPath = invokeElevenLabGeneration(narration, language)
-        mp3file = MP3(audioPath)
-        mp3Length = mp3file.info.length
-
-        audioName = audioPath.split("/")[-1]
-        public_url = upload_audio_to_gcs(audioPath, "audiocommentary", audioName)
-        
-        
-        dialogueComponent = {
-                    "type":"Dialogue",
-                    "url": public_url,
-                    "duration" : mp3Length
-                }
-        if(section["UIComponent"] is None):
-            print("UIComponent is None")
-            print(section)
-        uicomponent = uicomponentProcessor(section["UIComponent"])
-        
-        currentSection = {
-            "section_id" : section["id"],
-            "section_duration": mp3Length,
-            "section_components":[
-                dialogueComponent,
-                uicomponent
-            ]
-        }
-        
-        if uicomponent["type"] == "HighlightVideo":
-            try:
-                vidStamps = json.loads((generate_video_timestamps(uicomponent["data"]["url"], narration, mp3Length)))
-                vidStamps["start"] = format_timestamp(vidStamps["start"])
-                vidStamps["end"] = format_timestamp(vidStamps["end"])
-                uicomponent["data"]["vid_time"] = vidStamps
-
-               
-                #vidstamps is of the form {"start": HH:MM:SS, "end": HH:MM:SS}
-                convertStartToSeconds = lambda x: int(x.split(":")[0])*3600 + int(x.split(":")[1])*60 + int(x.split(":")[2])
-                start = convertStartToSeconds(vidStamps["start"])
-                end = convertStartToSeconds(vidStamps["end"])
-                vidDuration = end - start
-                currentSection["section_duration"] = max(vidDuration, mp3Length)
-            except Exception as e:
-                print(uicomponent)
-                print(e)
-                
-            
-            
+
+    for currentSection in iter_rewind_sections(game_id, focus_players, focus_areas, focus_teams, language):
         clientData["video"].append(currentSection)
         clientData["total_duration"] += currentSection["section_duration"]
 
-    cache_data(cacheKey, json.dumps(clientData))
+    cache_rewind(cacheKey, clientData)
     
     return clientData
 
+
+def stream_game_commentary(game_id, focus_players, focus_areas, focus_teams, music_url, language):
+    """
+    Same rewind as get_game_commentary, delivered as a sequence of messages:
+    {"type": "header", ...} first, then one {"type": "section", ...} per section in section order,
+    and finally {"type": "done", "total_duration": ...}.
+    A cached rewind is replayed from the cache. A generated one is cached once its last section is done.
+    """
+    cacheKey = build_rewind_cache_key(game_id, focus_players, focus_areas, focus_teams, music_url, language)
+    cached = get_cached_rewind(cacheKey)
+    if cached is not None:
+        yield {"type": "header", "id": cached["id"], "background_music_url": cached["background_music_url"]}
+        for index, currentSection in enumerate(cached["video"]):
+            yield {"type": "section", "index": index, "section": currentSection}
+        yield {"type": "done", "total_duration": cached["total_duration"]}
+        return
+
+    # the header does not depend on the generation, the client gets it right away
+    yield {"type": "header", "id": game_id, "background_music_url": music_url}
+
+    clientData = {
+        "id": game_id,
+        "total_duration":0,
+        "background_music_url": music_url,
+        "video":[
+           
+        ]
+    }
+    for index, currentSection in enumerate(iter_rewind_sections(game_id, focus_players, focus_areas, focus_teams, language)):
+        clientData["video"].append(currentSection)
+        clientData["total_duration"] += currentSection["section_duration"]
+        yield {"type": "section", "index": index, "section": currentSection}
+
+    cache_rewind(cacheKey, clientData)
+    yield {"type": "done", "total_duration": clientData["total_duration"]}
+
     
 # get_game_commentary("634594", ["Nolan Arenado", "Paul Goldschmidt"], ["batting", "pitching"], ["St. Louis Cardinals", "Miami Marlins"], "https://download.samplelib.com/mp3/sample-15s.mp3")
\ No newline at end of file
@@ -0,0 +1,165 @@
+import struct
+
+# MPEG version ids of the frame header
+_MPEG1, _MPEG2, _MPEG25 = 3, 2, 0
+
+_BITRATES = {
+    # (MPEG1?, layer) -> kbps by bitrate index
+    (True, 1): [0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+    (True, 2): [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+    (True, 3): [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    (False, 1): [0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+    (False, 2): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    (False, 3): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+_SAMPLE_RATES = {
+    _MPEG1: [44100, 48000, 32000],
+    _MPEG2: [22050, 24000, 16000],
+    _MPEG25: [11025, 12000, 8000],
+}
+_LAME_ENCODERS = (b"LAME", b"Lavf", b"Lavc")
+
+
+class MP3Frame:
+    """One parsed MPEG audio frame header."""
+
+    def __init__(self, offset, version, layer, bitrate, sample_rate, padding, mono):
+        self.offset = offset
+        self.version = version
+        self.layer = layer
+        self.bitrate = bitrate
+        self.sample_rate = sample_rate
+        self.mono = mono
+        if layer == 1:
+            self.samples = 384
+            self.length = (12 * bitrate // sample_rate + padding) * 4
+        else:
+            self.samples = 576 if layer == 3 and version != _MPEG1 else 1152
+            self.length = self.samples // 8 * bitrate // sample_rate + padding
+
+    @property
+    def side_info_size(self):
+        if self.version == _MPEG1:
+            return 17 if self.mono else 32
+        return 9 if self.mono else 17
+
+
+def parse_frame_header(data, offset):
+    """Parse the frame header at offset, or return None when there is no valid header there."""
+    if offset + 4 > len(data):
+        return None
+    b0, b1, b2, b3 = data[offset:offset + 4]
+    if b0 != 0xFF or b1 & 0xE0 != 0xE0:
+        return None
+    version = (b1 >> 3) & 3
+    layer = 4 - ((b1 >> 1) & 3)
+    bitrate_index = b2 >> 4
+    sample_rate_index = (b2 >> 2) & 3
+    # reserved version or layer, free format and bad bitrate, reserved sample rate
+    if version == 1 or layer == 4 or bitrate_index in (0, 15) or sample_rate_index == 3:
+        return None
+    bitrate = _BITRATES[(version == _MPEG1, layer)][bitrate_index] * 1000
+    sample_rate = _SAMPLE_RATES[version][sample_rate_index]
+    return MP3Frame(offset, version, layer, bitrate, sample_rate, (b2 >> 1) & 1, b3 >> 6 == 3)
+
+
+def _audio_bounds(data):
+    """Start and end of the audio frames, without the ID3v2 tag in front and the ID3v1 tag at the end."""
+    start = 0
+    if data[:3] == b"ID3" and len(data) >= 10:
+        size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+        footer = 10 if data[5] & 0x10 else 0
+        start = 10 + size + footer
+    end = len(data)
+    if end - start >= 128 and data[end - 128:end - 125] == b"TAG":
+        end -= 128
+    return start, end
+
+
+def _find_first_frame(data, start, end):
+    # a header only counts when the next frame starts right after it, so sync bytes inside
+    # tags or garbage are not taken for audio
+    offset = data.find(b"\xff", start, end)
+    while offset != -1:
+        frame = parse_frame_header(data, offset)
+        if frame is not None:
+            following = frame.offset + frame.length
+            if following >= end or parse_frame_header(data, following) is not None:
+                return frame
+        offset = data.find(b"\xff", offset + 1, end)
+    return None
+
+
+def _vbr_tag_samples(data, frame):
+    """Sample count from a Xing/Info (with LAME delay and padding) or VBRI tag in the first frame, or None."""
+    xing = frame.offset + 4 + frame.side_info_size
+    if data[xing:xing + 4] in (b"Xing", b"Info"):
+        flags = struct.unpack(">I", data[xing + 4:xing + 8])[0]
+        if not flags & 1:
+            return None
+        frames = struct.unpack(">I", data[xing + 8:xing + 12])[0]
+        samples = frames * frame.samples
+        lame = xing + 8 + (4 if flags & 0x1 else 0) + (4 if flags & 0x2 else 0) + (100 if flags & 0x4 else 0) + (4 if flags & 0x8 else 0)
+        if data[lame:lame + 4] in _LAME_ENCODERS and lame + 24 <= len(data):
+            delay_padding = int.from_bytes(data[lame + 21:lame + 24], "big")
+            samples -= (delay_padding >> 12) + (delay_padding & 0xFFF)
+        return max(samples, 0)
+
+    vbri = frame.offset + 4 + 32
+    if data[vbri:vbri + 4] == b"VBRI":
+        return struct.unpack(">I", data[vbri + 14:vbri + 18])[0] * frame.samples
+    return None
+
+
+def _cbr_frame_count(data, frame, end):
+    """
+    Frame count of a constant bitrate stream computed from its size, or None when the stream turns out
+    not to be CBR. The count is checked by finding the last frame header where CBR puts it.
+    """
+    # frames of a CBR stream average samples/8 * bitrate / sample_rate bytes, padding included
+    average = frame.samples / 8 * frame.bitrate / frame.sample_rate
+    if frame.layer == 1:
+        average = 12 * frame.bitrate / frame.sample_rate * 4
+    count = round((end - frame.offset) / average)
+    if count < 1:
+        return None
+    predicted = frame.offset + int((count - 1) * average)
+    for offset in range(predicted - 2, predicted + 3):
+        last = parse_frame_header(data, offset)
+        if last is not None and last.bitrate == frame.bitrate and last.sample_rate == frame.sample_rate \
+                and abs(last.offset + last.length - end) <= 1:
+            return count
+    return None
+
+
+def _scan_frame_count(data, frame, end):
+    """Walk from header to header (no decoding) and count the samples of every frame."""
+    samples = 0
+    offset = frame.offset
+    while offset < end:
+        current = parse_frame_header(data, offset)
+        if current is None or offset + current.length > end:
+            break
+        samples += current.samples
+        offset += current.length
+    return samples
+
+
+def get_mp3_duration(data):
+    """
+    Duration in seconds of an MP3 held in memory, read from the frame headers without decoding.
+    A Xing/Info or VBRI tag gives the frame count directly. Without one, a CBR stream is counted from
+    its size (checked against its last frame) and anything else is counted frame by frame.
+    Raises ValueError when there is no MPEG audio frame in data.
+    """
+    data = bytes(data)
+    start, end = _audio_bounds(data)
+    frame = _find_first_frame(data, start, end)
+    if frame is None:
+        raise ValueError("No MPEG audio frame found")
+
+    samples = _vbr_tag_samples(data, frame)
+    if samples is None:
+        count = _cbr_frame_count(data, frame, end)
+        samples = count * frame.samples if count is not None else _scan_frame_count(data, frame, end)
+    return samples / frame.sample_rate
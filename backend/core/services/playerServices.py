@@ -1,5 +1,15 @@
 import statsapi 
 import json
+import threading
+import time
+from collections import OrderedDict
+from core.services.httpClientService import stats_api_get
+
+# Player cards kept in memory: at most PLAYER_CARD_CACHE_SIZE cards, each for PLAYER_CARD_CACHE_TTL seconds
+PLAYER_CARD_CACHE_SIZE = 2048
+PLAYER_CARD_CACHE_TTL = 6 * 3600
+# Most person ids sent in one people request
+PLAYER_CARD_BATCH_SIZE = 50
 
 def get_player_id_with_name_and_team(player_name, team_name):
     """
@@ -22,9 +32,15 @@ def get_player_overall_stats(player_id):
     if not player_stats or 'stats' not in player_stats:
         return {"error": "No stats found for this player"}
 
+    return summarize_player_stats(player_stats.get("stats", []))
+
+def summarize_player_stats(stat_groups):
+    """
+    Reduce a list of {"group", "stats"} career stat groups to the overall stats shown on a player card.
+    """
     overall_stats = {}
 
-    for stat_group in player_stats.get("stats", []):
+    for stat_group in stat_groups:
         group_name = stat_group.get("group")
         stats_data = stat_group.get("stats", {})
 
@@ -62,17 +78,23 @@ def get_player_overall_stats(player_id):
 
     return overall_stats
 
-def get_player_card_data(player_id):
+def _hydrated_stat_groups(person):
+    # same records as statsapi.player_stat_data's "stats" list
+    stat_groups = []
+    for s in person.get("stats", []):
+        for split in s.get("splits", []):
+            stat_groups.append({
+                "type": s["type"]["displayName"],
+                "group": s["group"]["displayName"],
+                "stats": split["stat"],
+            })
+    return stat_groups
+
+def build_player_card(person, stats):
     """
-    Get the player's profile information, stats, and additional details.
+    Build the player card of a people API record and its overall stats.
     """
-    player_data = statsapi.get('person', {'personId': player_id})
-    if "people" not in player_data:
-        return {"error": "Player not found"}
-
-    person = player_data["people"][0]
-    stats = get_player_overall_stats(player_id)
-    
+    player_id = person.get("id")
     player_card = {
         "id": person.get("id"),
         "name": person.get("fullName"),
@@ -98,6 +120,86 @@ def get_player_card_data(player_id):
     
     return player_card
 
+
+class PlayerCardCache:
+    """
+    Thread-safe LRU cache of player cards whose entries also expire after a TTL.
+    """
+
+    def __init__(self, max_size=PLAYER_CARD_CACHE_SIZE, ttl=PLAYER_CARD_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._cards = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, player_id):
+        with self._lock:
+            entry = self._cards.get(player_id)
+            if entry is None:
+                return None
+            expires_at, card = entry
+            if expires_at < time.time():
+                del self._cards[player_id]
+                return None
+            self._cards.move_to_end(player_id)
+            return card
+
+    def set(self, player_id, card):
+        with self._lock:
+            self._cards[player_id] = (time.time() + self.ttl, card)
+            self._cards.move_to_end(player_id)
+            while len(self._cards) > self.max_size:
+                self._cards.popitem(last=False)
+
+
+player_card_cache = PlayerCardCache()
+
+
+def _download_player_cards(player_ids):
+    people = stats_api_get("v1/people", {
+        "personIds": ",".join(str(player_id) for player_id in player_ids),
+        "hydrate": "stats(group=[hitting,pitching,fielding],type=career,sportId=1)",
+    }).get("people", [])
+
+    return {
+        person["id"]: build_player_card(person, summarize_player_stats(_hydrated_stat_groups(person)))
+        for person in people
+    }
+
+
+def get_player_cards(player_ids):
+    """
+    Get the cards of many players, in the order of player_ids.
+    Cached cards are served from memory, the others are fetched PLAYER_CARD_BATCH_SIZE at a time through
+    one people request with hydrated career stats. Unknown players get {"id", "error"}.
+    """
+    player_ids = [int(player_id) for player_id in player_ids]
+    cards = {}
+    missing = []
+    for player_id in dict.fromkeys(player_ids):
+        card = player_card_cache.get(player_id)
+        if card is None:
+            missing.append(player_id)
+        else:
+            cards[player_id] = card
+
+    for i in range(0, len(missing), PLAYER_CARD_BATCH_SIZE):
+        for player_id, card in _download_player_cards(missing[i:i + PLAYER_CARD_BATCH_SIZE]).items():
+            player_card_cache.set(player_id, card)
+            cards[player_id] = card
+
+    return [cards.get(player_id, {"id": player_id, "error": "Player not found"}) for player_id in player_ids]
+
+
+def get_player_card_data(player_id):
+    """
+    Get the player's profile information, stats, and additional details.
+    """
+    card = get_player_cards([player_id])[0]
+    if "error" in card:
+        return {"error": "Player not found"}
+    return card
+
 # Example Usage:
 # print(get_player_card_data(545361))  # Mike Trout's player ID
 # print(get_player_card_data(660271))  # Aaron Judge's player ID
@@ -1,24 +1,137 @@
+import asyncio
+import logging
+import threading
+import weakref
+
 import redis
+import redis.asyncio as aioredis
+
+from core.config import REDIS_HOST, REDIS_PORT, REDIS_DB, REDIS_MAX_CONNECTIONS
+
+logger = logging.getLogger(__name__)
+
+# One connection pool for the whole process. Connections are opened lazily and reused across calls.
+_pool = redis.ConnectionPool(
+    host=REDIS_HOST,
+    port=REDIS_PORT,
+    db=REDIS_DB,
+    max_connections=REDIS_MAX_CONNECTIONS,
+    socket_connect_timeout=2,
+    socket_timeout=5,
+    health_check_interval=30,
+)
+_client = redis.Redis(connection_pool=_pool)
+
+# asyncio connections belong to the event loop that opened them, so async clients are kept per loop
+_async_clients = weakref.WeakKeyDictionary()
+
+_stats_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+
+
+def _count(values):
+    hits = sum(1 for value in values if value is not None)
+    with _stats_lock:
+        _stats["hits"] += hits
+        _stats["misses"] += len(values) - hits
+
+
+def get_redis_client():
+    return _client
+
+
+def get_async_redis_client():
+    """
+    Get the pooled asyncio client of the running event loop.
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = aioredis.Redis(
+            host=REDIS_HOST,
+            port=REDIS_PORT,
+            db=REDIS_DB,
+            max_connections=REDIS_MAX_CONNECTIONS,
+            socket_connect_timeout=2,
+            socket_timeout=5,
+            health_check_interval=30,
+        )
+        _async_clients[loop] = client
+    return client
+
+
+def get_cache_stats():
+    """
+    Hits and misses of the cache reads of this process.
+    """
+    with _stats_lock:
+        return dict(_stats)
 
 
+def cache_data(key, data, ttl=None):
+    # ttl is in seconds, None keeps the key until it is overwritten
+    _client.set(key, data, ex=ttl)
+    logger.debug(f"Cached {key}")
 
-def cache_data(key, data):
-    # Connect to the Redis server
-    r = redis.Redis(host='localhost', port=6379, db=0)
-    r.set(key, data)
-    print("Data cached successfully")
+
+def cache_many_data(items, ttl=None):
+    """
+    Store several key -> value pairs in one round trip.
+    """
+    pipeline = _client.pipeline(transaction=False)
+    for key, data in items.items():
+        pipeline.set(key, data, ex=ttl)
+    pipeline.execute()
 
 
 def get_cached_data(key):
-    # Connect to the Redis server
+    """
+    Get a cached value in a single round trip, None when the key does not exist.
+    """
     if key is None:
         return None
-    
-    r = redis.Redis(host='localhost', port=6379, db=0)
-    if r.exists(key):
-        print("Data retrieved successfully")
-        return r.get(key)
 
-    else:
+    value = _client.get(key)
+    _count([value])
+    return value
+
+
+def get_many_cached_data(keys):
+    """
+    Get several cached values in one round trip, in the order of keys (None for missing keys).
+    """
+    if not keys:
+        return []
+
+    values = _client.mget(keys)
+    _count(values)
+    return values
+
+
+async def async_cache_data(key, data, ttl=None):
+    await get_async_redis_client().set(key, data, ex=ttl)
+
 
+async def async_cache_many_data(items, ttl=None):
+    pipeline = get_async_redis_client().pipeline(transaction=False)
+    for key, data in items.items():
+        pipeline.set(key, data, ex=ttl)
+    await pipeline.execute()
+
+
+async def async_get_cached_data(key):
+    if key is None:
         return None
+
+    value = await get_async_redis_client().get(key)
+    _count([value])
+    return value
+
+
+async def async_get_many_cached_data(keys):
+    if not keys:
+        return []
+
+    values = await get_async_redis_client().mget(keys)
+    _count(values)
+    return values
@@ -0,0 +1,87 @@
+import hashlib
+import json
+import logging
+import threading
+import zlib
+
+from core.config import REWIND_CACHE_TTL, REWIND_CACHE_MAX_BYTES
+from core.services.redisCacheService import cache_data, get_cached_data
+
+logger = logging.getLogger(__name__)
+
+# Bump when the shape of the cached rewind changes, old entries are then never read again and expire
+REWIND_CACHE_SCHEMA_VERSION = 1
+
+_stats_lock = threading.Lock()
+_stats = {
+    "stored": 0,
+    "skipped_too_large": 0,
+    "raw_bytes": 0,
+    "compressed_bytes": 0,
+}
+
+
+def _normalize_list(values):
+    # order, case, surrounding spaces and duplicates do not change the rewind
+    return sorted({value.strip().casefold() for value in values if value and value.strip()})
+
+
+def build_rewind_cache_key(game_id, focus_players, focus_areas, focus_teams, music_url, language):
+    """
+    Build the canonical cache key of a rewind request: a hash of the normalized, sorted parameters
+    and the schema version. The game id stays readable in the key.
+    """
+    params = {
+        "game_id": str(game_id).strip(),
+        "focus_players": _normalize_list(focus_players),
+        "focus_areas": _normalize_list(focus_areas),
+        "focus_teams": _normalize_list(focus_teams),
+        "music_url": (music_url or "").strip(),
+        "language": (language or "").strip().lower(),
+    }
+    digest = hashlib.sha256(json.dumps(params, sort_keys=True, separators=(",", ":")).encode("utf-8")).hexdigest()
+    return f"rewind:v{REWIND_CACHE_SCHEMA_VERSION}:{params['game_id']}:{digest}"
+
+
+def get_cached_rewind(key):
+    """
+    Get a cached rewind, or None on a miss or an unreadable entry.
+    """
+    raw = get_cached_data(key)
+    if raw is None:
+        return None
+    try:
+        return json.loads(zlib.decompress(raw).decode("utf-8"))
+    except (zlib.error, ValueError) as e:
+        logger.warning(f"Ignoring unreadable rewind cache entry {key}: {e}")
+        return None
+
+
+def cache_rewind(key, client_data, ttl=REWIND_CACHE_TTL):
+    """
+    Store a rewind compressed, expiring after ttl seconds. Values larger than REWIND_CACHE_MAX_BYTES
+    once compressed are not stored.
+    """
+    raw = json.dumps(client_data, separators=(",", ":")).encode("utf-8")
+    compressed = zlib.compress(raw, 6)
+
+    if len(compressed) > REWIND_CACHE_MAX_BYTES:
+        logger.warning(f"Not caching rewind {key}: {len(compressed)} bytes compressed is over the limit.")
+        with _stats_lock:
+            _stats["skipped_too_large"] += 1
+        return False
+
+    cache_data(key, compressed, ttl)
+    with _stats_lock:
+        _stats["stored"] += 1
+        _stats["raw_bytes"] += len(raw)
+        _stats["compressed_bytes"] += len(compressed)
+    return True
+
+
+def get_rewind_cache_stats():
+    """
+    Counters of what this process stored in the rewind cache.
+    """
+    with _stats_lock:
+        return dict(_stats)
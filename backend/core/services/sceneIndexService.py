@@ -0,0 +1,147 @@
+import hashlib
+import logging
+import math
+import re
+from collections import Counter
+
+from core.config import SCENE_INDEX_FAILURE_TTL
+from core.services.cloudClientService import get_firestore_client
+from core.services.redisCacheService import cache_data, get_cached_data
+
+logger = logging.getLogger(__name__)
+
+# Firestore collection of the scene indexes, one document per highlight video
+SCENE_INDEX_COLLECTION = "gsmlbScenes"
+# Bump when the index format or the indexing prompt changes, older indexes are then rebuilt
+SCENE_INDEX_VERSION = 1
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+_STOP_WORDS = {
+    "the", "a", "an", "and", "or", "of", "to", "in", "on", "at", "for", "with", "by", "from", "as",
+    "is", "are", "was", "were", "be", "been", "it", "its", "this", "that", "his", "her", "their",
+    "he", "she", "they", "we", "you", "into", "up", "out", "off", "over", "after", "before", "then",
+    "look", "watch", "here", "there", "now", "just", "game", "video", "highlight", "clip",
+}
+
+
+def parse_timestamp(value):
+    """Seconds of an "HH:MM:SS" or "MM:SS" timestamp (a number is taken as seconds)."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    seconds = 0.0
+    for part in str(value).strip().split(":"):
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+
+def format_seconds(seconds):
+    seconds = int(round(seconds))
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def normalize_scene_index(raw):
+    """
+    Turn the model's {"duration": ..., "scenes": [{"start", "end", "description"}]} into an index with
+    times in seconds, sorted by start. Scenes with missing or inverted times are dropped.
+    """
+    scenes = []
+    for scene in raw.get("scenes", []):
+        try:
+            start = parse_timestamp(scene["start"])
+            end = parse_timestamp(scene["end"])
+        except (KeyError, TypeError, ValueError):
+            continue
+        if end > start >= 0:
+            scenes.append({"start": start, "end": end, "description": str(scene.get("description", ""))})
+    scenes.sort(key=lambda scene: scene["start"])
+
+    try:
+        duration = parse_timestamp(raw["duration"])
+    except (KeyError, TypeError, ValueError):
+        duration = 0.0
+    if scenes:
+        duration = max(duration, scenes[-1]["end"])
+    return {"version": SCENE_INDEX_VERSION, "duration": duration, "scenes": scenes}
+
+
+def _document(video_url):
+    doc_id = hashlib.sha256(video_url.strip().encode("utf-8")).hexdigest()
+    return get_firestore_client().collection(SCENE_INDEX_COLLECTION).document(doc_id)
+
+
+def get_stored_scene_index(video_url):
+    """
+    The scene index of a video, or None when it was never indexed (or with an older version).
+    """
+    doc = _document(video_url).get()
+    if not doc.exists:
+        return None
+    index = doc.to_dict()
+    if index.get("version") != SCENE_INDEX_VERSION:
+        return None
+    return index
+
+
+def store_scene_index(video_url, index):
+    _document(video_url).set(dict(index, url=video_url))
+
+
+def _failure_key(video_url):
+    return f"sceneidx:failed:v{SCENE_INDEX_VERSION}:{hashlib.sha256(video_url.strip().encode('utf-8')).hexdigest()[:32]}"
+
+
+def mark_scene_index_failed(video_url, ttl=SCENE_INDEX_FAILURE_TTL):
+    """
+    Remember for ttl seconds that indexing the video failed, so its narrations skip the index.
+    """
+    try:
+        cache_data(_failure_key(video_url), "1", ttl)
+    except Exception as e:
+        logger.warning(f"Could not mark the scene index of {video_url} as failed: {e}")
+
+
+def scene_index_failed_recently(video_url):
+    try:
+        return get_cached_data(_failure_key(video_url)) is not None
+    except Exception as e:
+        logger.warning(f"Scene index failure lookup failed for {video_url}: {e}")
+        return False
+
+
+def _tokens(text):
+    return [word for word in _WORD.findall(text.casefold()) if len(word) > 1 and word not in _STOP_WORDS]
+
+
+def _score_scenes(scenes, narration):
+    # words found in few scenes of the video say more about where the narration belongs
+    scene_tokens = [set(_tokens(scene["description"])) for scene in scenes]
+    document_frequency = Counter(token for tokens in scene_tokens for token in tokens)
+    narration_tokens = Counter(_tokens(narration))
+    return [
+        sum(count * math.log(1 + len(scenes) / document_frequency[token])
+            for token, count in narration_tokens.items() if token in tokens)
+        for tokens in scene_tokens
+    ]
+
+
+def match_narration_to_scenes(index, narration, narration_length):
+    """
+    Pick the video window for a narration from a scene index, without any model call.
+    The window starts at the scene sharing the most (rarest first) words with the narration and
+    lasts as long as the narration, shifted back if needed so it ends inside the video.
+    Returns {"start": "HH:MM:SS", "end": "HH:MM:SS"}, or None when no scene shares a word with the
+    narration (e.g. a narration in another language than the scene descriptions).
+    """
+    scenes = index.get("scenes") or []
+    if not scenes:
+        return None
+    scores = _score_scenes(scenes, narration)
+    best = max(range(len(scenes)), key=lambda i: (scores[i], -i))
+    if scores[best] <= 0:
+        return None
+
+    duration = index.get("duration") or scenes[-1]["end"]
+    length = min(float(narration_length), duration)
+    start = min(scenes[best]["start"], max(duration - length, 0.0))
+    # rounding to whole seconds must not shorten the window below the narration
+    return {"start": format_seconds(math.floor(start)), "end": format_seconds(min(math.ceil(start + length), math.ceil(duration)))}
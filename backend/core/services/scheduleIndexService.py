@@ -0,0 +1,190 @@
+import logging
+import sqlite3
+from contextlib import contextmanager
+import threading
+import time
+from datetime import datetime, timedelta
+
+from core.config import SCHEDULE_INDEX_PATH
+from core.services.httpClientService import stats_api_get
+from core.services.teamServices import get_team_logo_url
+
+logger = logging.getLogger(__name__)
+
+# The current season is fully resynced once a day, and the days around today more often
+# because that is where game states change.
+CURRENT_SEASON_FULL_SYNC_INTERVAL = 24 * 3600
+CURRENT_SEASON_RECENT_SYNC_INTERVAL = 600
+RECENT_SYNC_DAYS_BEFORE = 2
+RECENT_SYNC_DAYS_AFTER = 1
+
+_sync_lock = threading.Lock()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    game_pk INTEGER PRIMARY KEY,
+    official_date TEXT NOT NULL,
+    game_date TEXT NOT NULL,
+    season INTEGER NOT NULL,
+    home_id INTEGER NOT NULL,
+    home_name TEXT NOT NULL,
+    away_id INTEGER NOT NULL,
+    away_name TEXT NOT NULL,
+    state TEXT
+);
+CREATE INDEX IF NOT EXISTS games_by_official_date ON games (official_date, game_date);
+CREATE INDEX IF NOT EXISTS games_by_home_team ON games (home_id, official_date, game_date);
+CREATE INDEX IF NOT EXISTS games_by_away_team ON games (away_id, official_date, game_date);
+CREATE TABLE IF NOT EXISTS synced_seasons (
+    season INTEGER PRIMARY KEY,
+    complete INTEGER NOT NULL,
+    full_synced_at REAL NOT NULL,
+    recent_synced_at REAL NOT NULL
+);
+"""
+
+
+@contextmanager
+def _connect():
+    connection = sqlite3.connect(SCHEDULE_INDEX_PATH, timeout=30)
+    try:
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.executescript(_SCHEMA)
+        with connection:
+            yield connection
+    finally:
+        connection.close()
+
+
+def _download_schedule(start_date, end_date):
+    return stats_api_get("v1/schedule", {
+        "sportId": 1,  # MLB
+        "startDate": start_date,
+        "endDate": end_date,
+    })
+
+
+def _store_schedule(connection, data):
+    rows = []
+    for date_info in data.get("dates", []):
+        for game in date_info.get("games", []):
+            rows.append((
+                game["gamePk"],
+                game["officialDate"],
+                game.get("gameDate", game["officialDate"]),
+                int(game.get("season", game["officialDate"][:4])),
+                game["teams"]["home"]["team"]["id"],
+                game["teams"]["home"]["team"]["name"],
+                game["teams"]["away"]["team"]["id"],
+                game["teams"]["away"]["team"]["name"],
+                game.get("status", {}).get("abstractGameState"),
+            ))
+    connection.executemany("INSERT OR REPLACE INTO games VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+    return len(rows)
+
+
+def ensure_season_indexed(season):
+    """
+    Make sure the schedule of a season is in the local index.
+    Past seasons are downloaded once. The current season is refreshed from /schedule when it got stale.
+    """
+    today = datetime.now().date()
+    now = time.time()
+    with _sync_lock, _connect() as connection:
+        synced = connection.execute("SELECT * FROM synced_seasons WHERE season = ?", (season,)).fetchone()
+        if synced and synced["complete"]:
+            return
+
+        is_past = season < today.year
+        if synced is None or is_past or now - synced["full_synced_at"] > CURRENT_SEASON_FULL_SYNC_INTERVAL:
+            count = _store_schedule(connection, _download_schedule(f"{season}-01-01", f"{season}-12-31"))
+            logger.info(f"Indexed {count} games of season {season}.")
+            connection.execute(
+                "INSERT OR REPLACE INTO synced_seasons VALUES (?, ?, ?, ?)",
+                (season, int(is_past), now, now),
+            )
+        elif now - synced["recent_synced_at"] > CURRENT_SEASON_RECENT_SYNC_INTERVAL:
+            start_date = max(today - timedelta(days=RECENT_SYNC_DAYS_BEFORE), today.replace(month=1, day=1))
+            end_date = min(today + timedelta(days=RECENT_SYNC_DAYS_AFTER), today.replace(month=12, day=31))
+            _store_schedule(connection, _download_schedule(start_date.isoformat(), end_date.isoformat()))
+            connection.execute("UPDATE synced_seasons SET recent_synced_at = ? WHERE season = ?", (now, season))
+
+
+def _row_to_game(row):
+    return {
+        "game_id": row["game_pk"],
+        "date": row["official_date"],
+        "home_team": row["home_name"],
+        "away_team": row["away_name"],
+        "home_team_logo": get_team_logo_url(row["home_id"]),
+        "away_team_logo": get_team_logo_url(row["away_id"]),
+    }
+
+
+def _team_filter(team1_id, team2_id):
+    if team1_id and team2_id:
+        return " AND ((home_id = ? AND away_id = ?) OR (home_id = ? AND away_id = ?))", [team1_id, team2_id, team2_id, team1_id]
+    if team1_id:
+        return " AND (home_id = ? OR away_id = ?)", [team1_id, team1_id]
+    return "", []
+
+
+def find_indexed_games(start_date, end_date, team1_id=None, team2_id=None, limit=100):
+    """
+    Get the games between two dates (YYYY-MM-DD, inclusive) in date order.
+    With team1_id only games of that team, with both team ids only games between the two teams.
+    """
+    for season in range(int(start_date[:4]), int(end_date[:4]) + 1):
+        ensure_season_indexed(season)
+
+    team_clause, team_params = _team_filter(team1_id, team2_id)
+    with _connect() as connection:
+        rows = connection.execute(
+            "SELECT * FROM games WHERE official_date BETWEEN ? AND ?" + team_clause
+            + " ORDER BY official_date, game_date LIMIT ?",
+            [start_date, end_date] + team_params + [limit],
+        ).fetchall()
+    return [_row_to_game(row) for row in rows]
+
+
+def get_most_recent_indexed_games(team_id, count, cutoff_year=1900):
+    """
+    Get the 'count' most recent games up to today, newest first, optionally only those of team_id.
+    Seasons are indexed from the current one backwards until enough games are found.
+    """
+    # a negative LIMIT means no limit to SQLite
+    if count < 1:
+        return []
+    today = datetime.now().date().isoformat()
+    team_clause, team_params = _team_filter(team_id, None)
+    query = ("SELECT * FROM games WHERE official_date BETWEEN ? AND ?" + team_clause
+             + " ORDER BY game_date DESC LIMIT ?")
+
+    rows = []
+    for season in range(datetime.now().year, cutoff_year - 1, -1):
+        ensure_season_indexed(season)
+        # only look at the seasons indexed so far in this walk, other old seasons may be in the index too
+        with _connect() as connection:
+            rows = connection.execute(query, [f"{season}-01-01", today] + team_params + [count]).fetchall()
+        if len(rows) >= count:
+            break
+    return [_row_to_game(row) for row in rows]
+
+
+def get_indexed_game_pks(start_date, end_date, state=None):
+    """
+    Game pks between two dates (YYYY-MM-DD, inclusive) from the local index, optionally only those in
+    an abstract game state such as "Final". Seasons are indexed first, like find_indexed_games.
+    """
+    for season in range(int(start_date[:4]), int(end_date[:4]) + 1):
+        ensure_season_indexed(season)
+
+    query = "SELECT game_pk FROM games WHERE official_date BETWEEN ? AND ?"
+    params = [start_date, end_date]
+    if state is not None:
+        query += " AND state = ?"
+        params.append(state)
+    with _connect() as connection:
+        rows = connection.execute(query + " ORDER BY official_date, game_date", params).fetchall()
+    return [row["game_pk"] for row in rows]
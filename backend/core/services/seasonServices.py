@@ -22,17 +22,15 @@
 
 import requests
 import statsapi
+from core.services.httpClientService import stats_api_get
 
 
 def get_game_ids_in_season(season):
     """
     Get all game IDs in a specific season using the MLB Stats API directly.
     """
-    url = f"https://statsapi.mlb.com/api/v1/schedule?sportId=1&season={season}"
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-        schedule_dates = response.json().get("dates", [])
+        schedule_dates = stats_api_get("v1/schedule", {"sportId": 1, "season": season}).get("dates", [])
 
         # Extract game IDs from the schedule
         game_ids = [game["gamePk"] for date in schedule_dates for game in date["games"]]
@@ -0,0 +1,96 @@
+import logging
+import threading
+
+from core.services.httpClientService import stats_api_get
+
+logger = logging.getLogger(__name__)
+
+# Seconds between two background refreshes of the team list
+TEAM_REGISTRY_REFRESH_INTERVAL = 6 * 3600
+
+
+class TeamRegistry:
+    """
+    In-memory list of all MLB teams, loaded once and refreshed in the background.
+    Lookups by id, name, short name, team name and abbreviation are dict lookups.
+    """
+
+    def __init__(self):
+        self._teams = []
+        self._by_id = {}
+        self._by_key = {}
+        self._load_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def load(self):
+        """
+        Download the team list and swap it in.
+        """
+        teams = stats_api_get("v1/teams", {"sportId": 1}).get("teams", [])  # sportId 1 refers to MLB
+        by_id = {}
+        by_key = {}
+        for team in teams:
+            by_id[team["id"]] = team
+            for field in ("name", "shortName", "teamName", "abbreviation"):
+                if team.get(field):
+                    by_key.setdefault(team[field].lower(), team)
+        # swap all three together so readers never see a half built registry
+        self._teams, self._by_id, self._by_key = teams, by_id, by_key
+        logger.info(f"Team registry loaded {len(teams)} teams.")
+
+    def ensure_loaded(self):
+        if self._teams:
+            return
+        with self._load_lock:
+            if not self._teams:
+                self.load()
+
+    def start(self):
+        """
+        Load the teams now and keep refreshing them every TEAM_REGISTRY_REFRESH_INTERVAL seconds.
+        """
+        try:
+            self.ensure_loaded()
+        except Exception as e:
+            # the first lookup retries the load, the server still starts without the Stats API
+            logger.error(f"Could not preload the team registry: {e}")
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._refresh_loop, name="team-registry", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _refresh_loop(self):
+        while not self._stop.wait(TEAM_REGISTRY_REFRESH_INTERVAL):
+            try:
+                self.load()
+            except Exception as e:
+                logger.warning(f"Team registry refresh failed, keeping the previous list: {e}")
+
+    def all_teams(self):
+        self.ensure_loaded()
+        return self._teams
+
+    def get_by_id(self, team_id):
+        self.ensure_loaded()
+        return self._by_id.get(int(team_id))
+
+    def get_by_name(self, name):
+        """
+        Find a team by exact name, short name, team name or abbreviation (case insensitive),
+        then by partial match of the full name ("Yankees" finds "New York Yankees").
+        """
+        self.ensure_loaded()
+        lookup = name.strip().lower()
+        team = self._by_key.get(lookup)
+        if team is not None:
+            return team
+        for team in self._teams:
+            if lookup in team["name"].lower():
+                return team
+        return None
+
+
+team_registry = TeamRegistry()
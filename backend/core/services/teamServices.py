@@ -3,6 +3,10 @@ import statsapi
 from typing import List
 import requests
 import logging
+from datetime import datetime
+from core.services.feedCacheService import cached_fetch_with_ttl
+from core.services.httpClientService import stats_api_get
+from core.services.teamRegistryService import team_registry
 # Get Team Data
 
 
@@ -10,10 +14,10 @@ def get_all_teams():
     """
     Get all teams.
     """
-    teams = statsapi.get('teams', {'sportId': 1})  # sportId 1 refers to MLB
+    teams = team_registry.all_teams()
 
     # Extract team names and IDs
-    team_list = [(team['id'], team['name']) for team in teams['teams']]
+    team_list = [(team['id'], team['name']) for team in teams]
     logging.info(f"Found {len(team_list)} teams.")
     logging.info("Teams: %s", team_list)
     return team_list
@@ -43,7 +47,10 @@ def get_all_teams_display_data():
 def getTeamDetails(team_id):
     team_data = {}
     team_data['id'] = team_id
-    team_data['name'] = statsapi.lookup_team(team_id)[0]['name']
+    team = team_registry.get_by_id(team_id)
+    if team is None:
+        raise ValueError(f"Team ID {team_id} not found.")
+    team_data['name'] = team['name']
     team_data['logo'] = get_team_logo_url(team_id)
     #team_data['full_data'] = get_latest_full_team_data_with_id(team_id)
     #team_data['roster'] = get_latest_team_roster_with_id(team_id)
@@ -58,23 +65,19 @@ def getTeamDisplayData(team_id, name):
 
 def get_all_mlb_team_names() -> List[str]:
     """Fetches and returns a list of all MLB team names."""
-    teams_url = "https://statsapi.mlb.com/api/v1/teams"
-    response = requests.get(teams_url, params={"sportId": 1})  # sportId=1 ensures only MLB teams
-
-    if response.status_code == 200:
-        teams = response.json().get("teams", [])
-        return [team["name"] for team in teams]  # Extracting only MLB team names
-    
-    return []  # Return an empty list if the request fails
+    try:
+        return [team["name"] for team in team_registry.all_teams()]  # Extracting only MLB team names
+    except requests.exceptions.RequestException:
+        return []  # Return an empty list if the teams could not be loaded
 
 
 def get_team_id_with_name(team_name):
     """
     Get the team ID using the team name.
     """
-    team = statsapi.lookup_team(team_name)
+    team = team_registry.get_by_name(team_name)
     if team:
-        return team[0]['id']
+        return team['id']
     else:
         raise ValueError(f"Team '{team_name}' not found.")
 
@@ -111,47 +114,90 @@ def get_games_with_team_id_and_start_date(team_id,start_date):
     else:
         raise ValueError(f"No games found for team ID {team_id} on {start_date}.")
 
-def get_game_team_roster_with_team_id(team_id, game_id):
+def get_game_boxscore_data(game_id, boxscore_data=None):
+    """
+    Get the boxscore of a game, unless the caller already holds it. It is derived from the live feed,
+    so it goes through the pooled client and the feed cache (kept forever once the game is Final).
+    """
+    if boxscore_data is None:
+        # imported here, gameServices imports this module
+        from core.services.gameServices import GameSnapshot
+        boxscore_data = GameSnapshot(game_id).boxscore
+    return boxscore_data
+
+def _player_position(player):
+    position = player.get("position") or next(iter(player.get("allPositions") or []), {})
+    return position.get("abbreviation")
+
+def extract_team_roster(team_boxscore):
+    """
+    Turn one team's side of a boxscore into compact player records: {"id", "name", "position"}.
+    """
+    return [
+        {
+            "id": player["person"]["id"],
+            "name": player["person"]["fullName"],
+            "position": _player_position(player),
+        }
+        for player in team_boxscore["players"].values()
+    ]
+
+def get_game_rosters(game_id, boxscore_data=None):
+    """
+    Get both teams' rosters for a game from a single boxscore payload.
+
+    Returns {"home": {"team_id", "players"}, "away": {"team_id", "players"}} where players are
+    the records of extract_team_roster.
+    """
+    boxscore_data = get_game_boxscore_data(game_id, boxscore_data)
+    return {
+        side: {
+            "team_id": boxscore_data[side]["team"]["id"],
+            "players": extract_team_roster(boxscore_data[side]),
+        }
+        for side in ("home", "away")
+    }
+
+def get_game_team_roster(team_id, game_id, boxscore_data=None):
+    """
+    Get the compact roster of one team in a game. Raises ValueError if the team did not play in it.
+    """
+    rosters = get_game_rosters(game_id, boxscore_data)
+    for side in ("home", "away"):
+        if rosters[side]["team_id"] == int(team_id):
+            return rosters[side]["players"]
+    raise ValueError(f"Team ID {team_id} not found in game ID {game_id}.")
+
+def get_game_team_roster_with_team_id(team_id, game_id, boxscore_data=None):
     """
     Get the team roster for a specific game using the team ID and game ID.
+    Pass boxscore_data when the caller already holds the game's boxscore to skip the fetch.
     """
-    #print(statsapi.boxscore_data(game_id).keys())
-    #print(statsapi.boxscore_data(game_id)["teamInfo"])
-    boxscore_data = statsapi.boxscore_data(game_id)
-    
+    boxscore_data = get_game_boxscore_data(game_id, boxscore_data)
 
-    away_team_id = statsapi.boxscore_data(game_id)["away"]['team']["id"]
-    home_team_id = statsapi.boxscore_data(game_id)["home"]['team']["id"]
+    away_team_id = boxscore_data["away"]['team']["id"]
+    home_team_id = boxscore_data["home"]['team']["id"]
     
     if team_id == away_team_id:
-        return statsapi.boxscore_data(game_id)["away"]["players"]
+        return boxscore_data["away"]["players"]
     elif team_id == home_team_id:
-        return statsapi.boxscore_data(game_id)["home"]["players"]    
+        return boxscore_data["home"]["players"]    
     else:
         raise ValueError(f"Team ID {team_id} not found in game ID {game_id}.")
 
 
 
-def get_all_roster_ids(team_id, game_id):
+def get_all_roster_ids(team_id, game_id, boxscore_data=None):
     """
     Get all roster IDs for a specific team in a specific game.
     """
-    player = get_game_team_roster_with_team_id(team_id, game_id)
-    playerIds = []
-    for playerKey, playerValue in player.items():
-        playerIds.append(playerValue['person']['id'])
-    return playerIds
+    return [player["id"] for player in get_game_team_roster(team_id, game_id, boxscore_data)]
 
-def get_all_roster_names(team_id, game_id):
+def get_all_roster_names(team_id, game_id, boxscore_data=None):
     """
     Get all roster names for a specific team in a specific game.
     """
-    player = get_game_team_roster_with_team_id(team_id, game_id)
-    playerNames = []
-    for playerKey, playerValue in player.items():
-        playerNames.append(playerValue['person']['fullName'])
-    
-    return playerNames
+    return [player["name"] for player in get_game_team_roster(team_id, game_id, boxscore_data)]
     
 # Example Usage
 # try:
@@ -182,26 +228,45 @@ def get_all_roster_names(team_id, game_id):
 
 
 
-def get_team_leaders(team_id, season, gameType):
+TEAM_LEADER_CATEGORIES = ['onBasePlusSlugging', 'earnedRunAverage', 'fieldingPercentage']
+# Leaders of the running season are refetched once a day, those of finished seasons are kept forever
+CURRENT_SEASON_LEADERS_TTL = 24 * 3600
+
+def download_team_leaders(team_id, season, gameType):
     """
-    Get the team leaders for the specified team and season.
+    Fetch all leader categories of a team in one request and group the entries by category.
     """
-    leader_categories = ['onBasePlusSlugging', 'earnedRunAverage', 'fieldingPercentage']
-    team_leaders = {}
-
-    for category in leader_categories:
-        leaders = statsapi.get('team_leaders',
-        {
-            'teamId': team_id,
-            'leaderCategories': category,
-            'season': season,
-            'leaderGameTypes': gameType,
-            'limit': 3
-        })
-        team_leaders[category] = leaders  # This returns a list of lists
+    leaders = stats_api_get(f"v1/teams/{team_id}/leaders",
+    {
+        'leaderCategories': ",".join(TEAM_LEADER_CATEGORIES),
+        'season': season,
+        'leaderGameTypes': gameType,
+        'limit': 3
+    })
+
+    # same shape as one request per category: {category: {"teamLeaders": [...]}}
+    team_leaders = {category: {"teamLeaders": []} for category in TEAM_LEADER_CATEGORIES}
+    for entry in leaders.get("teamLeaders", []):
+        if entry.get("leaderCategory") in team_leaders:
+            team_leaders[entry["leaderCategory"]]["teamLeaders"].append(entry)
 
     return team_leaders
 
+def get_team_leaders(team_id, season, gameType):
+    """
+    Get the team leaders for the specified team and season, cached per (team, season, game type).
+    """
+    team_id = int(team_id)
+    season = int(season)
+    ttl = None if season < datetime.now().year else CURRENT_SEASON_LEADERS_TTL
+
+    return cached_fetch_with_ttl(
+        f"{team_id}_{season}_{gameType}",
+        "team_leaders",
+        lambda: download_team_leaders(team_id, season, gameType),
+        ttl,
+    )
+
 
 def textify_team_leaders(team_id, season, gameType):
     """
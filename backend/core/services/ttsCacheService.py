@@ -0,0 +1,61 @@
+import hashlib
+import json
+import logging
+
+from core.config import TTS_CACHE_TTL
+from core.services.redisCacheService import cache_data, get_cached_data
+
+logger = logging.getLogger(__name__)
+
+# Bump when the audio produced for the same TTS request changes (e.g. the normalization), so older
+# cached audio is not reused
+TTS_CACHE_VERSION = 1
+
+
+def build_tts_cache_key(text, voice_id, model_id, voice_settings, output_format):
+    """
+    Content address of a synthesized narration: a hash of everything that changes the audio.
+    """
+    params = {
+        "text": text,
+        "voice_id": voice_id,
+        "model_id": model_id,
+        "voice_settings": voice_settings,
+        "output_format": output_format,
+        "version": TTS_CACHE_VERSION,
+    }
+    digest = hashlib.sha256(json.dumps(params, sort_keys=True, separators=(",", ":")).encode("utf-8")).hexdigest()
+    return f"tts:v{TTS_CACHE_VERSION}:{digest}"
+
+
+def tts_audio_name(key):
+    """
+    Object name of the cached audio, derived from the key so the same narration always lands on the same object.
+    """
+    return f"tts/{key.rsplit(':', 1)[-1]}.mp3"
+
+
+def get_cached_tts(key):
+    """
+    Get {"url": ..., "duration": ...} of an already synthesized narration, or None.
+    A cache that cannot be reached counts as a miss.
+    """
+    try:
+        raw = get_cached_data(key)
+    except Exception as e:
+        logger.warning(f"TTS cache lookup failed for {key}: {e}")
+        return None
+    if raw is None:
+        return None
+    try:
+        return json.loads(raw)
+    except ValueError as e:
+        logger.warning(f"Ignoring unreadable TTS cache entry {key}: {e}")
+        return None
+
+
+def cache_tts(key, url, duration, ttl=TTS_CACHE_TTL):
+    try:
+        cache_data(key, json.dumps({"url": url, "duration": duration}), ttl)
+    except Exception as e:
+        logger.warning(f"Could not cache TTS audio {key}: {e}")
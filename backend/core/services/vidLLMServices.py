@@ -1,4 +1,3 @@
-import google.generativeai as genai
 import json
 import hashlib
 
@@ -9,34 +8,26 @@ def get_safe_doc_id(url):
 
 
 from core.services.gameServices import save_to_file
-# Configure Gemini API
-genai.configure(api_key="")# put your gemini api key here for testing for production use environment variables
-model = genai.GenerativeModel("gemini-1.5-pro-002")
+from core.services.cloudClientService import get_firestore_client, get_vertex_model
 
+# Gemini model used to place narrations in highlight videos, created on first use
+VIDEO_MODEL_NAME = "gemini-1.5-flash-002"  # or "gemini-1.5-pro"
 
-import vertexai
-from vertexai.generative_models import GenerativeModel, Part
 
-# Initialize Vertex AI with your Google Cloud Project
-PROJECT_ID = "rewind-448923"  # Replace with your GCP project ID
-vertexai.init(project=PROJECT_ID, location="us-central1")
-
-# Initialize the model (Use "gemini-1.5-pro" for better results)
-model = GenerativeModel("gemini-1.5-flash-002")  # or "gemini-1.5-pro"
-
-
-
-import requests
-from google.cloud import storage, firestore
+from core.services.httpClientService import http_get
+from core.services.gcloudServices import upload_stream_to_gcs
+from core.services.singleFlightService import SingleFlight
+from core.services.sceneIndexService import get_stored_scene_index, store_scene_index, normalize_scene_index, match_narration_to_scenes, mark_scene_index_failed, scene_index_failed_recently
+from core.services.videoTimestampCacheService import build_video_timestamp_cache_key, get_cached_video_timestamps, cache_video_timestamps
 
 # Your Google Cloud Storage bucket name
 GCS_BUCKET_NAME = "mlb-highlights-private"
 
-# Initialize Google Cloud Storage Client
-storage_client = storage.Client()
-bucket = storage_client.bucket(GCS_BUCKET_NAME)
-
-db = firestore.Client()
+VIDEO_DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+# (connect, read) timeouts, the read timeout is between two chunks and not for the whole video
+VIDEO_DOWNLOAD_TIMEOUT = (3.05, 60)
+ingestFlights = SingleFlight()
+sceneIndexFlights = SingleFlight()
 
 COLLECTION_NAME = "gsmlb"
 tempStore = {}
@@ -44,14 +35,14 @@ def addToVidStore(gsURL, mlbURL):
 
     doc_id = get_safe_doc_id(mlbURL)  # Convert mlbURL to a safe ID
 
-    doc_ref = db.collection(COLLECTION_NAME).document(doc_id)
+    doc_ref = get_firestore_client().collection(COLLECTION_NAME).document(doc_id)
     doc_ref.set({"gsURL": gsURL})
     return gsURL
 
 
 def getFromVidStore(mlbURL):
     doc_id = get_safe_doc_id(mlbURL)  # Convert mlbURL to a safe ID
-    doc_ref = db.collection(COLLECTION_NAME).document(doc_id)
+    doc_ref = get_firestore_client().collection(COLLECTION_NAME).document(doc_id)
     doc = doc_ref.get()
     if doc.exists:
         return doc.to_dict().get("gsURL")
@@ -63,43 +54,136 @@ def getFromVidStore(mlbURL):
 def download_and_upload_mlb_video(mlb_video_url, video_filename):
     """
     Downloads an MLB highlight video and uploads it to a private GCS bucket.
+    Concurrent requests for the same video share one ingest.
     """
-    # Step 1: Download video from MLB
-
-    if getFromVidStore(mlb_video_url) is not None:
+    existing = getFromVidStore(mlb_video_url)
+    if existing is not None:
         print(f"Video already exists in GCS: {mlb_video_url}")
-        print(f"Returning GCS URL: {getFromVidStore(mlb_video_url)}")
-        return getFromVidStore(mlb_video_url)
+        return existing
+
+    return ingestFlights.do(mlb_video_url, lambda: ingest_mlb_video(mlb_video_url, video_filename))
+
 
-    response = requests.get(mlb_video_url, stream=True)
-    if response.status_code == 200:
+def ingest_mlb_video(mlb_video_url, video_filename):
+    # another request may have finished the same ingest since the lookup
+    existing = getFromVidStore(mlb_video_url)
+    if existing is not None:
+        return existing
+
+    # Step 1: Download video from MLB
+    response = http_get(mlb_video_url, stream=True, timeout=VIDEO_DOWNLOAD_TIMEOUT)
+    with response:
+        if response.status_code != 200:
+            raise ValueError(f"Failed to download video. Status Code: {response.status_code}")
         print(f"Downloading: {mlb_video_url}")
-        blob = bucket.blob(video_filename)
-        
-        # Step 2: Upload to GCS
-        blob.upload_from_string(response.content, content_type="video/mp4")
-       
 
-        # Step 3: Make sure the file is PRIVATE (default setting)
-        blob.acl.save_predefined("private")
-        gcs_url = f"gs://{GCS_BUCKET_NAME}/{video_filename}"
-        # Store the mapping in Firestore
-        addToVidStore(gcs_url, mlb_video_url)
+        # Step 2: Stream it to GCS in chunks, the video is never fully in memory.
+        # Step 3: the file is PRIVATE (default setting)
+        expected_size = response.headers.get("Content-Length")
+        upload_stream_to_gcs(
+            response.iter_content(chunk_size=VIDEO_DOWNLOAD_CHUNK_SIZE),
+            GCS_BUCKET_NAME,
+            video_filename,
+            "video/mp4",
+            expected_size=int(expected_size) if expected_size and not response.headers.get("Content-Encoding") else None,
+            predefined_acl="private",
+        )
+
+    gcs_url = f"gs://{GCS_BUCKET_NAME}/{video_filename}"
+    # Store the mapping in Firestore
+    addToVidStore(gcs_url, mlb_video_url)
+
+    # Step 4: Return the GCS URI
+    return gcs_url
+
+
+
+
+SCENE_INDEX_PROMPT = """
+    Please analyze the mlb highlight provided and split it into its scenes (chapters): every pitch, hit, catch, run, celebration or replay that can be told apart.
+
+    Return a json object with the total length of the video and the list of scenes in order. Every scene has its start and end timestamps in HH:MM:SS format and a short english description of what happens, naming the players and teams involved and the type of play (for example home run, strikeout, diving catch, double play, stolen base, walk-off).
 
-        # Step 4: Return the GCS URI
-        return f"gs://{GCS_BUCKET_NAME}/{video_filename}"
-    else:
-        raise ValueError(f"Failed to download video. Status Code: {response.status_code}")
+    Give me the json directly with NO ```json or code``` blocks.
+    Example:
+
+    {
+        "duration": "00:01:05",
+        "scenes": [
+            {"start": "00:00:00", "end": "00:00:08", "description": "Aaron Judge steps in against the Red Sox pitcher with two runners on"},
+            {"start": "00:00:08", "end": "00:00:20", "description": "Aaron Judge hits a three run home run to left field for the Yankees"}
+        ]
+    }
+"""
 
 
+def index_video_scenes(gcsURL):
+    """
+    One Gemini pass over a highlight video, returning its normalized scene index.
+    """
+    from vertexai.generative_models import Part
+
+    video_file = Part.from_uri(uri=gcsURL, mime_type="video/mp4")
+    response = get_vertex_model(VIDEO_MODEL_NAME).generate_content([video_file, SCENE_INDEX_PROMPT])
+    return normalize_scene_index(json.loads(response.text.strip()))
+
+
+def get_video_scene_index(mlbVidURL):
+    """
+    The scene index of a highlight video. The video is ingested and indexed the first time only,
+    concurrent requests for the same video share that work.
+    Returns None while a recent indexing attempt of the video failed (for SCENE_INDEX_FAILURE_TTL).
+    """
+    index = get_stored_scene_index(mlbVidURL)
+    if index is not None:
+        return index
+    if scene_index_failed_recently(mlbVidURL):
+        return None
+    return sceneIndexFlights.do(mlbVidURL, lambda: build_video_scene_index(mlbVidURL))
+
+
+def build_video_scene_index(mlbVidURL):
+    index = get_stored_scene_index(mlbVidURL)
+    if index is not None:
+        return index
+    gcsURL = download_and_upload_mlb_video(mlbVidURL, mlbVidURL.split("/")[-1])
+    try:
+        index = index_video_scenes(gcsURL)
+    except Exception:
+        # an unusable answer or a Vertex error, the next narrations of the video go to the fallback directly
+        mark_scene_index_failed(mlbVidURL)
+        raise
+    store_scene_index(mlbVidURL, index)
+    print(f"Indexed {len(index['scenes'])} scenes of {mlbVidURL}")
+    return index
 
 
 def generate_video_timestamps(mlbVidURL, narrationDescription, narrationLength):
     """
     Uses Gemini 1.5 to analyze a video from Google Cloud Storage (GCS)
     and generate timestamps with chapter summaries.
+    Answers are cached by video, narration and narration duration bucket; a cached answer skips the
+    video ingest and the model call.
+    The window is normally picked locally from the scene index of the video. The video is only sent
+    with the narration to the model when the index has no scene matching the narration.
     """
 
+    cacheKey = build_video_timestamp_cache_key(mlbVidURL, narrationDescription, narrationLength)
+    cached = get_cached_video_timestamps(cacheKey)
+    if cached is not None:
+        return json.dumps(cached)
+
+    # match the narration against the scene index of the video, the video is sent to the model once per video
+    try:
+        index = get_video_scene_index(mlbVidURL)
+        timestamps = match_narration_to_scenes(index, narrationDescription, narrationLength) if index is not None else None
+    except Exception as e:
+        print(f"Error using the scene index of {mlbVidURL}, asking the model instead: {e}")
+        timestamps = None
+    if timestamps is not None:
+        cache_video_timestamps(cacheKey, timestamps)
+        return json.dumps(timestamps)
+
     gcsURL = None
     try:
         video_filename = mlbVidURL.split("/")[-1]  # Example: "highlight.mp4"
@@ -139,18 +223,29 @@ def generate_video_timestamps(mlbVidURL, narrationDescription, narrationLength):
     """
 
     try:
+        from vertexai.generative_models import Part
+
         # Load video from Google Cloud Storage (GCS)
         video_file = Part.from_uri(uri=gcsURL, mime_type="video/mp4")
 
         # Send video and prompt to Gemini
-        response = model.generate_content([video_file, prompt])
+        response = get_vertex_model(VIDEO_MODEL_NAME).generate_content([video_file, prompt])
         # Print the structured JSON response
-        return response.text  # The response will be in JSON format
+        result = response.text  # The response will be in JSON format
     except Exception as e:
         print(f"Error generating video timestamps: {e}")
         print("^^From the video timestamp generation function")
         raise e
 
+    # only well formed answers are cached, anything else is returned as is for the caller to handle
+    try:
+        timestamps = json.loads(result)
+        if isinstance(timestamps, dict) and "start" in timestamps and "end" in timestamps:
+            cache_video_timestamps(cacheKey, timestamps)
+    except ValueError:
+        pass
+    return result
+
 
 # Example Usage
 # if __name__ == "__main__":
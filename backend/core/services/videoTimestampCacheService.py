@@ -0,0 +1,52 @@
+import hashlib
+import json
+import logging
+import math
+
+from core.config import VIDEO_TIMESTAMP_CACHE_TTL, VIDEO_TIMESTAMP_DURATION_BUCKET
+from core.services.redisCacheService import cache_data, get_cached_data
+
+logger = logging.getLogger(__name__)
+
+# Bump when the prompt changes the answers, older entries are then never read again and expire
+VIDEO_TIMESTAMP_CACHE_VERSION = 1
+
+
+def _sha256(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def build_video_timestamp_cache_key(video_url, narration, narration_length):
+    """
+    Cache key of a timestamp answer: the video url, the narration text (case and spacing do not matter)
+    and the narration duration rounded to VIDEO_TIMESTAMP_DURATION_BUCKET seconds.
+    """
+    normalized = " ".join(narration.split()).casefold()
+    duration_bucket = math.floor(float(narration_length) / VIDEO_TIMESTAMP_DURATION_BUCKET)
+    return (f"vidts:v{VIDEO_TIMESTAMP_CACHE_VERSION}:{_sha256(video_url.strip())[:32]}:"
+            f"{_sha256(normalized)[:32]}:{duration_bucket}")
+
+
+def get_cached_video_timestamps(key):
+    """
+    Get a cached {"start": ..., "end": ...}, or None. A cache that cannot be reached counts as a miss.
+    """
+    try:
+        raw = get_cached_data(key)
+    except Exception as e:
+        logger.warning(f"Video timestamp cache lookup failed for {key}: {e}")
+        return None
+    if raw is None:
+        return None
+    try:
+        return json.loads(raw)
+    except ValueError as e:
+        logger.warning(f"Ignoring unreadable video timestamp cache entry {key}: {e}")
+        return None
+
+
+def cache_video_timestamps(key, timestamps, ttl=VIDEO_TIMESTAMP_CACHE_TTL):
+    try:
+        cache_data(key, json.dumps({"start": timestamps["start"], "end": timestamps["end"]}), ttl)
+    except Exception as e:
+        logger.warning(f"Could not cache video timestamps {key}: {e}")
@@ -4,9 +4,10 @@ import uuid
 from elevenlabs import VoiceSettings
 from elevenlabs.client import ElevenLabs
 from mutagen.mp3 import MP3
-from core.services.audioModifyServices import normalize_audio
+from core.services.audioModifyServices import normalize_audio, normalize_pcm, encode_pcm_to_mp3
 
 from core.services.languageService import languageVoiceMapping
+from core.services.ttsCacheService import build_tts_cache_key
 ELEVENLABS_API_KEY = ""# put your eleven labs api key here for testing for production use environment variables
 
 
@@ -19,11 +20,19 @@ def createAudioFromText(dialogueText, voiceType, sessionId):
 
 def invokeElevenLabGeneration(dialogueText, language): 
     # Uses Eleven Lab TTS. Do not call this function. For internal use only.
-    audioFile = textToAudio(dialogueText, language)
-    audioPath = saveAudioToFile(audioFile)
+    # textToAudio returns PCM, the file gets the normalized MP3
+    audioPath = saveAudioToFile([synthesizeAudio(dialogueText, language)], normalize=False)
     return audioPath
 
 
+def synthesizeAudio(dialogueText, language):
+    """
+    Eleven Lab TTS without temp files: returns the normalized MP3 as bytes.
+    """
+    pcm = b"".join(chunk for chunk in textToAudio(dialogueText, language) if chunk)
+    return encode_pcm_to_mp3(normalize_pcm(pcm), TTS_PCM_FRAME_RATE)
+
+
 
 def uploadAudioToGCS(audioPath, bucketName, fileName):
     # Uploads audio to GCS. Do not call this
@@ -46,29 +55,47 @@ voice2 = "sfmzdbhtmFeQb5D4tEio"
 voice3 = "0m1WGWVzxS7KbWobXtnw"
 model1 = "eleven_turbo_v2"
 model2 = "eleven_turbo_v2_5"
-def textToAudio(text, language):
-
+# everything below changes the synthesized audio and is part of the TTS cache key
+TTS_MODEL_ID = model2 # use the turbo model for low latency
+# raw 16 bit mono PCM: it is normalized with NumPy and encoded once, with no MP3 decode in between
+TTS_OUTPUT_FORMAT = "pcm_22050"
+TTS_PCM_FRAME_RATE = 22050
+TTS_VOICE_SETTINGS = {
+    "stability": 0.5,
+    "similarity_boost": 0.7,
+    "style": 0.1,
+    # "use_speaker_boost": True,
+}
+
+
+def getVoiceForLanguage(language):
     if language not in languageVoiceMapping:
         raise ValueError(f"Voice for language {language} not found")
-    voice = languageVoiceMapping[language]
+    return languageVoiceMapping[language]
+
+
+def getTTSCacheKey(text, language):
+    """
+    Cache key of the audio textToAudio would produce for this text and language.
+    """
+    return build_tts_cache_key(text, getVoiceForLanguage(language), TTS_MODEL_ID, TTS_VOICE_SETTINGS, TTS_OUTPUT_FORMAT)
+
+
+def textToAudio(text, language):
+    voice = getVoiceForLanguage(language)
 
     response = client.text_to_speech.convert(
         voice_id=voice,
-        output_format="mp3_22050_32",
+        output_format=TTS_OUTPUT_FORMAT,
         text=text,
-        model_id=model2, # use the turbo model for low latency
-        voice_settings=VoiceSettings(
-            stability=0.5,
-            similarity_boost=0.7,
-            style=0.1,
-            # use_speaker_boost=True,
-        ),
+        model_id=TTS_MODEL_ID,
+        voice_settings=VoiceSettings(**TTS_VOICE_SETTINGS),
     )
 
     
     return response
 
-def saveAudioToFile(response, key=None):
+def saveAudioToFile(response, key=None, normalize=True):
     # save in folder (or create one if doesn't exist) called tempAudio
     if key is None:
         key = ""
@@ -84,6 +111,9 @@ def saveAudioToFile(response, key=None):
         for chunk in response:
             if chunk:
                 f.write(chunk)
+
+    if not normalize:
+        return save_file_path
     
     # Normalize the audio
     normalize_audio(save_file_path, processed_file_path)
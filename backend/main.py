@@ -8,6 +8,10 @@ from core.routes.teamRoute import router as team_router
 from core.routes.gameRoutes import router as game_router
 from core.routes.music import router as music_router
 from core.routes.language import router as language_router
+from core.routes.playerRoute import router as player_router
+from core.services.teamRegistryService import team_registry
+from core.services.highlightWarmerService import highlight_warmer
+from core.config import HIGHLIGHT_WARMER_ENABLED
 from fastapi.middleware.cors import CORSMiddleware
 
 app = FastAPI()
@@ -34,6 +38,19 @@ app.include_router(team_router)
 app.include_router(game_router)
 app.include_router(music_router)
 app.include_router(language_router)
+app.include_router(player_router)
+
+@app.on_event("startup")
+def preload_team_registry():
+    # teams are loaded once here and refreshed in the background, routes read them from memory
+    team_registry.start()
+
+@app.on_event("startup")
+def start_highlight_warmer():
+    # mirrors the highlight videos of games that just went Final, see HIGHLIGHT_WARMER_ENABLED
+    if HIGHLIGHT_WARMER_ENABLED:
+        highlight_warmer.start()
+
 @app.get("/")
 def read_root():
     return {"message": "Welcome to the Core API!"}
@@ -18,6 +18,7 @@ export default function FocusModal({
   const [teamsOptionsIds, setTeamsOptionsIds] = useState({});
   const [homeTeamInfo, setHomeTeamInfo] = useState({});
   const [awayTeamInfo, setAwayTeamInfo] = useState({});
+  const [playerCards, setPlayerCards] = useState({});
   const [eventOptions, setEventOptions] = useState([]);
   const [userDefinedEvents, setUserDefinedEvents] = useState("");
 
@@ -80,6 +81,34 @@ export default function FocusModal({
     fetchTeamInfos();
   }, [teamsOptionsIds, gameId]);
 
+  useEffect(() => {
+    // one batched request for the cards of both rosters, once both are loaded
+    if (!homeTeamInfo.roster || !awayTeamInfo.roster) return;
+    const ids = [...homeTeamInfo.roster, ...awayTeamInfo.roster].map((player) => player.id);
+    if (ids.length === 0) return;
+    // a response for rosters that were replaced in the meantime is ignored
+    let ignore = false;
+    const fetchPlayerCards = async () => {
+      try {
+        const response = await fetch(`http://shortpitchserver.com/getPlayerCards?ids=${ids.join(",")}`);
+        if (!response.ok) throw new Error(`HTTP error! Status: ${response.status}`);
+        const data = await response.json();
+        if (ignore) return;
+        const cardsById = {};
+        (data.players || []).forEach((card) => {
+          if (!card.error) cardsById[card.id] = card;
+        });
+        setPlayerCards(cardsById);
+      } catch (error) {
+        console.error("Error fetching player cards:", error);
+      }
+    };
+    fetchPlayerCards();
+    return () => {
+      ignore = true;
+    };
+  }, [homeTeamInfo, awayTeamInfo]);
+
   // Toggle selection functions
   const toggleTeamSelection = (team) => {
     setSelectedTeams((prev) =>
@@ -231,6 +260,12 @@ export default function FocusModal({
                       />
                     </div>
                     <span className="text-sm font-semibold mt-2">{player.name}</span>
+                    {playerCards[player.id] && (
+                      <span className="text-xs opacity-75">
+                        {playerCards[player.id].position}
+                        {playerCards[player.id].jersey_number ? ` #${playerCards[player.id].jersey_number}` : ""}
+                      </span>
+                    )}
                   </button>
                 ))}
               </div>
@@ -254,6 +289,12 @@ export default function FocusModal({
                       />
                     </div>
                     <span className="text-sm font-semibold mt-2">{player.name}</span>
+                    {playerCards[player.id] && (
+                      <span className="text-xs opacity-75">
+                        {playerCards[player.id].position}
+                        {playerCards[player.id].jersey_number ? ` #${playerCards[player.id].jersey_number}` : ""}
+                      </span>
+                    )}
                   </button>
                 ))}
               </div>